@@ -0,0 +1,5 @@
+"""
+Benchmarks of the rendering pipeline on synthetic documents.
+
+Run them with `python -m benchmarks`, see benchmarks/run.py.
+"""
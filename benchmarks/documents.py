@@ -0,0 +1,122 @@
+"""
+Synthetic piko documents, each stressing one part of the pipeline.
+
+Every generator returns the XML of a whole page, the same parameters
+always produce the same document.
+"""
+
+from typing import Callable, Dict
+from xml.sax.saxutils import escape
+
+# named, xterm 256-color and 24-bit color values, in the order they are used
+COLORS = (
+    "white",
+    "black",
+    "blue",
+    "red",
+    "green",
+    "yellow",
+    "magenta",
+    "cyan",
+    "208",
+    "33",
+    "#ff8800",
+    "#3366cc",
+)
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua"
+).split()
+
+
+def _page(body: str) -> str:
+    return f'<piko type="m100_xml">\n{body}\n</piko>'
+
+
+def _words(count: int, offset: int = 0) -> str:
+    return " ".join(WORDS[(offset + i) % len(WORDS)] for i in range(count))
+
+
+def nested(depth: int = 40, siblings: int = 3) -> str:
+    """Containers nested `depth` deep, with a few paragraphs at every level."""
+    body = ""
+    for level in reversed(range(depth)):
+        paragraphs = "".join(
+            f"<text>{_words(12, level + i)}</text>" for i in range(siblings)
+        )
+        direction = "row" if level % 2 else "column"
+        body = (
+            f'<container direction="{direction}" width="100pc" padding-left="1">'
+            f"{paragraphs}{body}</container>"
+        )
+    return _page(body)
+
+
+def table(rows: int = 200, columns: int = 12) -> str:
+    """A bordered table of `rows` rows and `columns` columns of short text."""
+    lines = []
+    for row in range(rows):
+        # cells only hold elements, their text is in a text element
+        cells = "".join(
+            f"<cell><text>{_words(1 + (row + column) % 3, row * columns + column)}"
+            "</text></cell>"
+            for column in range(columns)
+        )
+        lines.append(f"<row>{cells}</row>")
+    return _page('<table border="thin">' + "".join(lines) + "</table>")
+
+
+def preserved_text(lines: int = 2000, width: int = 120) -> str:
+    """One preserved text element of `lines` lines `width` characters wide."""
+    text = "\n".join(
+        escape(_words(width // 4, line)[:width].ljust(width)) for line in range(lines)
+    )
+    return _page(f'<text preserve="true">{text}</text>')
+
+
+def inputs(count: int = 200) -> str:
+    """A form of `count` labelled inputs with initial values."""
+    fields = "".join(
+        f'<container direction="row" width="100pc">'
+        f'<text width="20">{_words(2, i)}</text>'
+        f'<input width="40" initial="{_words(3, i)}" submit="save"></input>'
+        f"</container>"
+        for i in range(count)
+    )
+    return _page(fields + '<action name="save">var("value", value)</action>')
+
+
+def fonts(count: int = 12, font: str = "small") -> str:
+    """`count` headings in an ASCII-art font, between paragraphs."""
+    body = "".join(
+        f'<text font="{font}" padding-bottom="1">Heading {i}</text>'
+        f"<text>{_words(40, i)}</text>"
+        for i in range(count)
+    )
+    return _page(body)
+
+
+def colors(rows: int = 100, columns: int = 10) -> str:
+    """Rows of text runs that each change the background and foreground."""
+    lines = []
+    for row in range(rows):
+        runs = "".join(
+            f'<text background="{COLORS[(row + column) % len(COLORS)]}" '
+            f'foreground="{COLORS[(row + column + 5) % len(COLORS)]}">'
+            f"{_words(1, row + column)}</text>"
+            for column in range(columns)
+        )
+        lines.append(f'<container direction="row" width="100pc">{runs}</container>')
+    return _page("".join(lines))
+
+
+# the generators by name, all of them run by default
+DOCUMENTS: Dict[str, Callable[..., str]] = {
+    "nested": nested,
+    "table": table,
+    "preserved_text": preserved_text,
+    "inputs": inputs,
+    "fonts": fonts,
+    "colors": colors,
+}
@@ -0,0 +1,186 @@
+"""
+Times each stage of the pipeline on the synthetic documents.
+
+    python -m benchmarks [--width W] [--height H] [--repeat N] [--output FILE]
+                         [NAME[:key=value,...] ...]
+
+Pages are rendered to a headless terminal, so no TTY or network is needed.
+The results are written as JSON, to compare them across commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import piko.adom
+from piko.backends import HeadlessBackend
+from piko.browser import Browser
+from piko.profiler import profiler
+from piko.renderer import Renderer
+from piko.rendering import font_cache
+from piko.rendering.font_cache import renderFont
+from piko.rendering.layout import layoutDocument
+from piko.rendering.text_util import clearWrapCache
+from piko.window import Window
+
+from .documents import DOCUMENTS
+
+# the URL the generated documents are shown at
+URL = "piko://benchmark"
+
+# stages taken from the phases of the profiler, for frames drawn in full
+FRAME_PHASES = {
+    "layout": "layout_cached",
+    "paint": "paint",
+    "flatten": "flatten",
+    "flush": "flush",
+}
+
+
+def benchmark(xml: str, width: int, height: int, repeat: int) -> dict:
+    """Time parsing, layout, painting, flattening and flushing a document.
+
+    parse and layout start from a new document each time, with no wrapped
+    text or ASCII-art fonts cached. The frames are drawn in full like after
+    a resize, their layout is cached by the first frame. scroll frames
+    move down a row at a time and only draw what changed.
+    """
+    browser = Browser(URL)
+    times: Dict[str, List[float]] = {"parse": [], "layout": []}
+    for _ in range(repeat):
+        renderFont.cache_clear()
+        clearWrapCache()
+        document, duration = _timed(piko.adom.xml2doc, xml, browser)
+        times["parse"].append(duration)
+        _, duration = _timed(layoutDocument, document, width, height)
+        times["layout"].append(duration)
+
+    window = Window(HeadlessBackend(width, height))
+    renderer = Renderer(window, browser)
+    browser.finish_load(URL, document)
+
+    profiler.enabled = True
+    profiler.reset()
+    times["frame"] = []
+    for _ in range(repeat):
+        # drops the last frame, so everything is drawn again
+        window.resize()
+        _, duration = _timed(_frame, renderer, window, True)
+        times["frame"].append(duration)
+    for phase, stage in FRAME_PHASES.items():
+        times[stage] = list(profiler.samples[phase])
+
+    times["scroll"] = []
+    for _ in range(repeat):
+        browser.scroll += 1
+        _, duration = _timed(_frame, renderer, window, False)
+        times["scroll"].append(duration)
+    profiler.enabled = False
+
+    return {
+        "bytes": len(xml.encode("utf-8")),
+        "elements": len(piko.adom.get_all_elements(document.elements)),
+        "stages": {stage: _summary(samples) for stage, samples in times.items()},
+    }
+
+
+def _frame(renderer: Renderer, window: Window, force: bool) -> None:
+    # what TerminalBrowser._render does
+    if renderer.render(force=force):
+        window.refresh()
+        profiler.end_frame()
+
+
+def _timed(function: Callable, *args) -> Tuple[object, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _summary(samples: List[float]) -> Optional[dict]:
+    """min, median, mean and max of samples in milliseconds."""
+    if not samples:
+        return None
+    return {
+        "min": round(min(samples) * 1000, 3),
+        "median": round(statistics.median(samples) * 1000, 3),
+        "mean": round(statistics.mean(samples) * 1000, 3),
+        "max": round(max(samples) * 1000, 3),
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_document(spec: str) -> Tuple[str, Dict[str, object]]:
+    """Parse NAME[:key=value,...] into a generator name and its parameters."""
+    name, _, params = spec.partition(":")
+    if name not in DOCUMENTS:
+        raise argparse.ArgumentTypeError(
+            f"unknown document `{name}`, one of: {', '.join(DOCUMENTS)}"
+        )
+    kwargs: Dict[str, object] = {}
+    for param in filter(None, params.split(",")):
+        key, _, value = param.partition("=")
+        kwargs[key] = int(value) if value.isdigit() else value
+    return name, kwargs
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "documents",
+        nargs="*",
+        type=parse_document,
+        metavar="NAME[:key=value,...]",
+        help="documents to benchmark and the parameters of their generator, "
+        f"all of them by default: {', '.join(DOCUMENTS)}",
+    )
+    parser.add_argument("--width", type=int, default=120)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20, help="runs of each stage")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON to FILE")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    # fonts are rendered every time instead of being read from the user's cache
+    font_cache.FONT_DISK_CACHE = False
+
+    results = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "width": args.width,
+        "height": args.height,
+        "repeat": args.repeat,
+        "documents": {},
+    }
+    for name, kwargs in args.documents or [(name, {}) for name in DOCUMENTS]:
+        xml = DOCUMENTS[name](**kwargs)
+        result = benchmark(xml, args.width, args.height, args.repeat)
+        results["documents"][name] = {"params": kwargs, **result}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(results, stream, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
@@ -9,6 +9,7 @@ from typing import List
 
 import simpleeval
 
+from ..profiler import profiler
 from .constants import URL_BAR_INDEX
 from .elements import Action, Element, createTextElement
 from .utils import get_all_elements
@@ -18,12 +19,17 @@ class Document:
     def __init__(self, browser: "Browser"):
         self.browser = browser
         self.links: List[Element] = []
+        # top level elements, changed through appendElement and setElements
         self.elements: List[Element] = []
+        # bumped by every change to the elements, see Element.invalidate
+        self.version = 0
         self.actions: List[Action] = []
         self.focus = -1
         self.hasInputs = False
         self.background = "black"
         self.foreground = "white"
+        # errors of the load, shown in the debug window with the page
+        self.load_errors: List[str] = []
         self.evaluator = self.createEvaluator()
 
     def createEvaluator(self):
@@ -33,9 +39,21 @@ class Document:
         return e
 
     def with_message(self, message: str):
-        self.elements = [createTextElement(message)]
+        self.setElements([createTextElement(message)])
         return self
 
+    def appendElement(self, element: Element):
+        element.document = self
+        self.elements.append(element)
+        self.version += 1
+
+    def setElements(self, elements: List[Element]):
+        for element in self.elements:
+            element.document = None
+        self.elements = []
+        for element in elements:
+            self.appendElement(element)
+
     def focus_next(self):
         all: List[Element] = get_all_elements(self.elements)
         focusable = ("input",)
@@ -136,8 +154,9 @@ class Document:
         action = self.find_action(name)
         if action is None:
             return
-        self.evaluator.names = {**args, **self.browser.get_global_variables()}
-        self.evaluator.eval("(" + action.code + ")")
+        with profiler.measure("script", action=name):
+            self.evaluator.names = {**args, **self.browser.get_global_variables()}
+            self.evaluator.eval("(" + action.code + ")")
 
     def call_element_action(self, element: Element, name: str, args: dict):
         actionCall = element.getAttribute(name)
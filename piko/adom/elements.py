@@ -1,6 +1,9 @@
 """Element classes for the ADOM module."""
 
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .document import Document
 
 
 class Action:
@@ -18,15 +21,74 @@ class Attribute:
 class Element:
     def __init__(self, type):
         self.type = type
-        self.value: str | None = None
+        self._value: str | None = None
         self.attributes: List[Attribute] = []
         self.children: List[Element] = []
-        self.focused = False
-        self.focus_cursor_index = 0
+        self._focused = False
+        self._focus_cursor_index = 0
         self.parent: Element | None = None
+        # only set on top level elements, see Document.appendElement
+        self.document: Optional[Document] = None
+        # measured layout results keyed by the size available to the element
+        self.layout_cache: Dict[tuple, object] = {}
+
+    @property
+    def value(self) -> Optional[str]:
+        return self._value
+
+    @value.setter
+    def value(self, value: Optional[str]):
+        if value != self._value:
+            self._value = value
+            self.invalidate()
+
+    # focus and cursor are drawn when painting, they don't change the layout
+    @property
+    def focused(self) -> bool:
+        return self._focused
+
+    @focused.setter
+    def focused(self, focused: bool):
+        if focused != self._focused:
+            self._focused = focused
+            self._touch()
+
+    @property
+    def focus_cursor_index(self) -> int:
+        return self._focus_cursor_index
+
+    @focus_cursor_index.setter
+    def focus_cursor_index(self, index: int):
+        if index != self._focus_cursor_index:
+            self._focus_cursor_index = index
+            self._touch()
+
+    def invalidate(self):
+        """Drop cached layout for this element and all of its ancestors.
+
+        Elements with an empty layout cache are the dirty subtrees that the
+        next layout pass measures again.
+        """
+        element = self
+        while True:
+            element.layout_cache.clear()
+            if element.parent is None:
+                break
+            element = element.parent
+        if element.document is not None:
+            element.document.version += 1
+
+    def _touch(self):
+        """Bump the version of the document without dropping any layout."""
+        element = self
+        while element.parent is not None:
+            element = element.parent
+        if element.document is not None:
+            element.document.version += 1
 
     def setAttribute(self, name, value):
         self.attributes.append(Attribute(name, value))
+        self.invalidate()
 
     def getAttribute(self, name) -> str:
         if name != "":
@@ -39,6 +101,8 @@ class Element:
 
     def appendChild(self, child):
         self.children.append(child)
+        child.parent = self
+        self.invalidate()
 
     def find_element_by_id(self, id: str):
         if self.getAttribute("id") == id:
@@ -3,13 +3,12 @@
 import xml.etree.ElementTree as ET
 
 from .document import Document
-from .elements import Action, Element, createTextElement
+from .elements import Action, Element
 
 
 def _crashDoc(reason: str, lineNumber: int, browser):
     doc = Document(browser)
-    doc.elements = [createTextElement(f"Line {lineNumber + 1}: " + reason)]
-    return doc
+    return doc.with_message(f"Line {lineNumber + 1}: " + reason)
 
 
 def xml2doc(contents, browser):
@@ -47,7 +46,7 @@ def xml2doc(contents, browser):
         else:
             element = _xml_element_to_adom(child, res)
             if element:
-                res.elements.append(element)
+                res.appendElement(element)
 
     return res
 
@@ -106,6 +105,5 @@ def _xml_element_to_adom(xml_element: ET.Element, document: Document):
         child_element = _xml_element_to_adom(child, document)
         if child_element:
             element.appendChild(child_element)
-            child_element.parent = element
 
     return element
@@ -5,14 +5,17 @@ Main application module for the terminal browser.
 import argparse
 import curses
 import sys
-import time
 import traceback
 from typing import Optional
 
+from .backends import AnsiBackend, Backend, CursesBackend, detect_capabilities
 from .browser import Browser
-from .config import ESCAPE_DELAY_MS, FPS
+from .config import BACKEND, RUNTIME
+from .events import KEYS, LOADED, EventQueue
 from .input_handler import InputHandler
+from .profiler import profiler
 from .renderer import Renderer
+from .tracing import Tracer
 from .window import Window
 
 
@@ -24,77 +27,136 @@ class TerminalBrowser:
         self.renderer: Optional[Renderer] = None
         self.initial_url = initial_url or "piko://welcome"
         self.force_render = False
+        self.events = EventQueue()
 
-    def setup(self, screen: curses.window) -> None:
-        """Initialize the terminal browser."""
-        self.window = Window(screen)
-        self.browser = Browser(self.initial_url)
-        self.input_handler = InputHandler(self.window, self.browser)
+    def setup(self, backend: Backend) -> None:
+        """Initialize the terminal browser on a terminal backend and run it."""
+        self.window = Window(backend)
+        self.browser = Browser(self.initial_url, self.events)
+        self.input_handler = InputHandler(self.window, self.browser, self.events)
         self.renderer = Renderer(self.window, self.browser)
 
-        self._initialize_colors()
-        curses.set_escdelay(ESCAPE_DELAY_MS)
         self.input_handler.start_input_thread()
         self._main_loop()
 
-    def _initialize_colors(self) -> None:
-        """Initialize color pairs for curses."""
-        from .config import COLORMAP
-
-        for background in range(1, 9):
-            for foreground in range(1, 9):
-                key = background * 10 + foreground
-                curses.init_pair(key, COLORMAP[foreground], COLORMAP[background])
-
     def _main_loop(self) -> None:
-        """Main application loop."""
+        """Main application loop.
+
+        Sleeps until the input or load thread posts an event. Events are
+        applied here, so only this thread changes the browser state and
+        renders never see it half changed. A frame that is due waits for
+        the pacer, so FPS caps the frame rate.
+        """
+        render_pending = True
         while True:
             try:
-                if self.window.get_resized():
-                    self.window.resize()
-                    self.force_render = True  # Force a re-render after resize
-                    continue
+                timeout = self.window.pacer.delay() if render_pending else None
+                events = self.events.wait(timeout)
+                if events:
+                    render_pending = True
+                for event, data in events:
+                    self._handle_event(event, data)
 
                 self._update()
 
-                # Always render if force_render is True, otherwise normal render check
-                if self.force_render:
-                    self.renderer.render(force=True)
-                    self.force_render = False
-                else:
-                    self.renderer.render()
+                if self.window.get_resized():
+                    self.window.resize()
+                    self.force_render = True  # Force a re-render after resize
 
                 if self.browser.loading:
                     self.browser.start_load()
 
-                self.window.refresh()
-                time.sleep(1 / FPS)
+                # frames are held back while the terminal is still busy with
+                # the last one, the next frame shows whatever changed meanwhile
+                if render_pending and self.window.pacer.ready():
+                    self._render()
+                    render_pending = False
             except KeyboardInterrupt:
-                curses.endwin()
+                self.window.close()
                 sys.exit(0)
             except Exception as e:
                 traceback.print_exc(file=sys.stdout)
                 self.browser.debug(str(e))
 
+    def _handle_event(self, event: str, data) -> None:
+        if event == KEYS:
+            self.input_handler.handle_keys(data)
+        elif event == LOADED:
+            self.browser.finish_load(*data)
+
+    def _render(self) -> None:
+        with profiler.trace("frame"):
+            # Always render if force_render is True, otherwise normal render check
+            if self.force_render:
+                rendered = self.renderer.render(force=True)
+                self.force_render = False
+            else:
+                rendered = self.renderer.render()
+
+            # the terminal is only written to when a frame was produced
+            if rendered:
+                self.window.refresh()
+                profiler.end_frame()
+
     def _update(self) -> None:
         """Update application state."""
         if self.window.exiting:
             sys.exit(0)
 
 
-def parse_args() -> Optional[str]:
+def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--url", help="the URL you would like to visit")
-    args = parser.parse_args()
-    return args.url
+    parser.add_argument(
+        "--backend",
+        choices=["curses", "ansi"],
+        default=BACKEND,
+        help="how to draw to the terminal",
+    )
+    parser.add_argument(
+        "--runtime",
+        choices=["threads", "asyncio"],
+        default=RUNTIME,
+        help="how input, page loads and frames are scheduled",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="write a trace of frames, page loads and scripts to FILE on exit, "
+        "in the Chrome trace event format",
+    )
+    return parser.parse_args()
 
 
 def main() -> None:
     """Application entry point."""
-    initial_url = parse_args()
-    browser = TerminalBrowser(initial_url)
-    curses.wrapper(browser.setup)
+    args = parse_args()
+    if args.runtime == "asyncio":
+        from .async_app import AsyncTerminalBrowser
+
+        browser = AsyncTerminalBrowser(args.url)
+    else:
+        browser = TerminalBrowser(args.url)
+    if args.trace:
+        profiler.tracer = Tracer()
+    # queried once, before a backend starts reading keys
+    capabilities = detect_capabilities(sys.stdin.fileno(), sys.stdout.fileno())
+    try:
+        if args.backend == "ansi":
+            backend = AnsiBackend(capabilities=capabilities)
+            try:
+                browser.setup(backend)
+            finally:
+                backend.close()
+        else:
+            curses.wrapper(
+                lambda screen: browser.setup(CursesBackend(screen, capabilities))
+            )
+    finally:
+        # the browser only stops by exiting
+        if profiler.tracer is not None:
+            profiler.tracer.write(args.trace)
 
 
 if __name__ == "__main__":
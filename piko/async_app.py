@@ -0,0 +1,161 @@
+"""
+asyncio runtime for the terminal browser.
+"""
+
+import asyncio
+import signal
+import sys
+import threading
+import traceback
+from concurrent.futures import Executor, Future
+from typing import List, Optional
+
+from .app import TerminalBrowser
+from .backends import Backend
+from .browser import Browser
+from .input_handler import InputHandler
+from .renderer import Renderer
+from .rendering.text_util import prerenderFonts
+from .window import Window
+
+
+class DaemonExecutor(Executor):
+    """Runs every call on its own daemon thread.
+
+    Unlike with a thread pool, a fetch that is still running when the
+    browser exits doesn't hold up the exit.
+    """
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+
+class AsyncTerminalBrowser(TerminalBrowser):
+    """The terminal browser on an asyncio event loop instead of threads.
+
+    Keys are read when the loop sees the terminal readable, pages load in
+    tasks that are cancelled when another page is opened, and frames are
+    scheduled on the loop. Fetching, parsing and rendering fonts run in an
+    executor, everything else runs on the loop.
+    """
+
+    def __init__(self, initial_url: Optional[str] = None):
+        super().__init__(initial_url)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.load_task: Optional[asyncio.Task] = None
+        self.load_url: Optional[str] = None
+        self.frame: Optional[asyncio.TimerHandle] = None
+        self.executor = DaemonExecutor()
+
+    def setup(self, backend: Backend) -> None:
+        """Initialize the terminal browser on a terminal backend and run it."""
+        self.window = Window(backend)
+        # pages are loaded by the runtime, not by a load thread
+        self.browser = Browser(self.initial_url)
+        self.input_handler = InputHandler(self.window, self.browser, self.events)
+        self.renderer = Renderer(self.window, self.browser)
+
+        try:
+            asyncio.run(self._run())
+        except KeyboardInterrupt:
+            self.window.close()
+            sys.exit(0)
+
+    async def _run(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.loop.set_exception_handler(self._on_error)
+
+        fds = self.window.backend.input_fds()
+        for fd in fds:
+            self.loop.add_reader(fd, self._on_readable)
+        if not fds:
+            # the backend can only block until keys arrive
+            threading.Thread(target=self._read_keys, daemon=True).start()
+
+        try:
+            self.loop.add_signal_handler(signal.SIGWINCH, self._changed)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass  # not on the main thread, resizes then arrive as keys
+
+        self._changed()
+        # runs until a key or a script exits
+        await self.loop.create_future()
+
+    def _on_readable(self) -> None:
+        keys = self.window.backend.read_keys()
+        if keys:
+            self._on_keys(keys)
+
+    def _read_keys(self) -> None:
+        while not self.window.exiting:
+            self.loop.call_soon_threadsafe(self._on_keys, self.window.get_keys())
+
+    def _on_keys(self, keys: List[int]) -> None:
+        self.input_handler.handle_keys(keys)
+        self._changed()
+
+    def _changed(self) -> None:
+        """Follow up on a change to the state and schedule a frame."""
+        self._update()
+
+        if self.window.get_resized():
+            self.window.resize()
+            self.force_render = True  # Force a re-render after resize
+
+        # only opening a page starts a load, not editing the URL bar
+        if self.browser.loading and self.load_url != self.browser.requested_url:
+            self._start_load()
+
+        # frames are held back while the terminal is still busy with the last one
+        if self.frame is None:
+            self.frame = self.loop.call_later(self.window.pacer.delay(), self._frame)
+
+    def _frame(self) -> None:
+        self.frame = None
+        self._render()
+
+    def _start_load(self) -> None:
+        # the page that was still loading isn't shown anymore
+        if self.load_task is not None:
+            self.load_task.cancel()
+        self.load_url = self.browser.begin_load()
+        self.load_task = self.loop.create_task(self._load(self.load_url))
+        self.load_task.add_done_callback(self._load_done)
+
+    async def _load(self, URL: str) -> None:
+        document = await self.loop.run_in_executor(
+            self.executor, self.browser.load_document, URL
+        )
+        await self.loop.run_in_executor(
+            self.executor, prerenderFonts, document.elements
+        )
+
+        self.load_task = None
+        self.load_url = None
+        self.browser.finish_load(URL, document)
+        self._changed()
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self._on_error(self.loop, {"exception": task.exception()})
+
+    def _on_error(self, loop: asyncio.AbstractEventLoop, context: dict) -> None:
+        exception = context.get("exception")
+        if exception is None:
+            loop.default_exception_handler(context)
+            return
+        traceback.print_exception(
+            type(exception), exception, exception.__traceback__, file=sys.stdout
+        )
+        self.browser.debug(str(exception))
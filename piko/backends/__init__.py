@@ -0,0 +1,20 @@
+"""Terminal backends.
+
+A backend is the device a Window draws to and reads keys from.
+"""
+
+from .ansi import AnsiBackend
+from .base import Backend
+from .capabilities import Capabilities, detect_capabilities
+from .curses_backend import CursesBackend
+from .headless import HeadlessBackend, HeadlessFrame
+
+__all__ = [
+    "AnsiBackend",
+    "Backend",
+    "Capabilities",
+    "CursesBackend",
+    "HeadlessBackend",
+    "HeadlessFrame",
+    "detect_capabilities",
+]
@@ -0,0 +1,303 @@
+import codecs
+import os
+import re
+import select
+import signal
+import sys
+import termios
+import tty
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..config import (
+    ESCAPE_DELAY_MS,
+    KEY_DOWN,
+    KEY_ENTER,
+    KEY_LEFT,
+    KEY_RESIZE,
+    KEY_RIGHT,
+    KEY_UP,
+)
+from ..rendering.palette import getPaletteColor
+from ..rendering.style_constants import STYLE_CODES
+from .base import Backend
+from .capabilities import SYNC_BEGIN, SYNC_END, Capabilities
+
+# escape sequences of the keys the browser handles, as curses key codes
+KEY_SEQUENCES = {
+    "\x1b[A": KEY_UP,
+    "\x1bOA": KEY_UP,
+    "\x1b[B": KEY_DOWN,
+    "\x1bOB": KEY_DOWN,
+    "\x1b[C": KEY_RIGHT,
+    "\x1bOC": KEY_RIGHT,
+    "\x1b[D": KEY_LEFT,
+    "\x1bOD": KEY_LEFT,
+}
+
+# SGR parameters that turn the style codes of the frame buffer on and off
+STYLE_ON = {STYLE_CODES["bold"]: "1", STYLE_CODES["underline"]: "4"}
+STYLE_OFF = {STYLE_CODES["bold"]: "22", STYLE_CODES["underline"]: "24"}
+
+# erasing to the end of the row takes 3 bytes, shorter blank runs are written
+ERASE_MIN_BLANKS = 4
+
+# runs of a repeated character that REP or ECH may write in fewer bytes
+REPEATED_RUN = re.compile(r"(.)\1{3,}")
+
+
+class AnsiBackend(Backend):
+    """Writes ANSI escape sequences straight to the terminal.
+
+    The cursor position and SGR state of the terminal are tracked so only
+    the sequences that change them are sent, and each frame goes out in a
+    single write(), wrapped in synchronized output markers if the terminal
+    supports them. Colors that are not named are sent as 256 or 24-bit
+    colors, so they don't need curses color pairs.
+    """
+
+    def __init__(self, input=None, output=None, capabilities=None):
+        self.input_fd = (input or sys.stdin).fileno()
+        self.output_fd = (output or sys.stdout).fileno()
+        self.height, self.width = self._query_size()
+        self.capabilities: Capabilities = capabilities or Capabilities()
+
+        self.out: List[str] = []
+        # None when unknown, after a reset or when the cursor is past the edge
+        self.cursor: Optional[Tuple[int, int]] = None
+        self.sgr: Optional[Tuple[int, int, int]] = None
+        self.colors: Dict[Tuple[int, int], str] = {}
+
+        self.keys: Deque[int] = deque()
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.saved_mode = None
+        # SIGWINCH writes to this pipe so a resize wakes up get_input
+        self.resize_pipe: Optional[Tuple[int, int]] = None
+        self.saved_handler = None
+
+    def _query_size(self) -> Tuple[int, int]:
+        size = os.get_terminal_size(self.output_fd)
+        return size.lines, size.columns
+
+    def start(self) -> None:
+        self.saved_mode = termios.tcgetattr(self.input_fd)
+        tty.setcbreak(self.input_fd)
+        # alternate screen, hidden cursor, cleared
+        self._write("\x1b[?1049h\x1b[?25l\x1b[0m\x1b[2J")
+
+        self.resize_pipe = os.pipe()
+        os.set_blocking(self.resize_pipe[1], False)
+        self.saved_handler = signal.signal(signal.SIGWINCH, self._on_resize)
+
+    def close(self) -> None:
+        if self.saved_mode is None:
+            return
+        self._write("\x1b[0m\x1b[?25h\x1b[?1049l")
+        termios.tcsetattr(self.input_fd, termios.TCSADRAIN, self.saved_mode)
+        self.saved_mode = None
+        signal.signal(signal.SIGWINCH, self.saved_handler or signal.SIG_DFL)
+        for fd in self.resize_pipe:
+            os.close(fd)
+        self.resize_pipe = None
+
+    def _on_resize(self, signum, frame):
+        try:
+            os.write(self.resize_pipe[1], b"\0")
+        except BlockingIOError:
+            pass  # a resize is already pending
+
+    def get_size(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def resized(self, height: int, width: int) -> bool:
+        return self._query_size() != (height, width)
+
+    def resize(self) -> Tuple[int, int]:
+        self.height, self.width = self._query_size()
+        self.out.append("\x1b[0m\x1b[2J")
+        self.cursor = None
+        self.sgr = None
+        return self.height, self.width
+
+    def draw(
+        self, y: int, x: int, text: str, style: int, background: int, foreground: int
+    ) -> None:
+        out = self.out
+        if self.cursor != (y, x):
+            out.append(self._move(y, x))
+        if self.sgr != (style, background, foreground):
+            out.append(self._sgr(style, background, foreground))
+
+        end = x + len(text)
+        # blanks up to the end of the row are erased, which fills them with
+        # the current background but can't underline them
+        if end == self.width and style != STYLE_CODES["underline"]:
+            stripped = text.rstrip(" ")
+            if len(text) - len(stripped) >= ERASE_MIN_BLANKS:
+                out.append(stripped)
+                out.append("\x1b[K")
+                self.cursor = (y, x + len(stripped))
+                return
+
+        if REPEATED_RUN.search(text) is not None:
+            text = self._encode_runs(text, style != STYLE_CODES["underline"])
+        out.append(text)
+        # after the last column the terminal waits to wrap, the position is unclear
+        self.cursor = (y, end) if end < self.width else None
+
+    def flush(self) -> int:
+        if not self.out:
+            return 0
+        data = "".join(self.out)
+        self.out = []
+        if self.capabilities.synchronized_output:
+            data = SYNC_BEGIN + data + SYNC_END
+        return self._write(data)
+
+    def get_input(self) -> int:
+        while not self.keys:
+            self._read_keys()
+        return self.keys.popleft()
+
+    def get_keys(self) -> List[int]:
+        while not self.keys:
+            self._read_keys()
+        return self.read_keys()
+
+    def input_fds(self) -> List[int]:
+        return [self.input_fd, self.resize_pipe[0]]
+
+    def read_keys(self) -> List[int]:
+        # a paste arrives in several reads
+        while select.select(self.input_fds(), [], [], 0)[0]:
+            self._read_keys()
+        keys = list(self.keys)
+        self.keys.clear()
+        return keys
+
+    def _read_keys(self):
+        ready, _, _ = select.select([self.input_fd, self.resize_pipe[0]], [], [])
+        if self.resize_pipe[0] in ready:
+            os.read(self.resize_pipe[0], 1024)
+            self.keys.append(KEY_RESIZE)
+        if self.input_fd not in ready:
+            return
+
+        data = self.decoder.decode(os.read(self.input_fd, 1024))
+        # a trailing escape is either the escape key or a sequence still arriving
+        while _incomplete_sequence(data):
+            ready, _, _ = select.select([self.input_fd], [], [], ESCAPE_DELAY_MS / 1000)
+            if not ready:
+                break
+            data += self.decoder.decode(os.read(self.input_fd, 1024))
+
+        i = 0
+        while i < len(data):
+            if data[i] == "\x1b" and i + 1 < len(data) and data[i + 1] in "[O":
+                # parameters up to the final byte of the sequence
+                end = i + 2
+                while end < len(data) and not "@" <= data[end] <= "~":
+                    end += 1
+                key = KEY_SEQUENCES.get(data[i : end + 1])
+                if key is not None:
+                    self.keys.append(key)
+                i = end + 1
+                continue
+            self.keys.append(KEY_ENTER if data[i] == "\r" else ord(data[i]))
+            i += 1
+
+    def _write(self, data: str) -> int:
+        encoded = data.encode("utf-8")
+        size = len(encoded)
+        while encoded:
+            written = os.write(self.output_fd, encoded)
+            encoded = encoded[written:]
+        return size
+
+    def _encode_runs(self, text: str, erase: bool) -> str:
+        """Write long runs of a character with REP, and of blanks with ECH.
+
+        Both leave the cursor where writing the run out would, ECH blanks
+        the cells with the current background so it can't underline them.
+        A run is only replaced when the sequence is shorter.
+        """
+        parts = []
+        last = 0
+        for match in REPEATED_RUN.finditer(text):
+            char = match.group(1)
+            start, end = match.span()
+            count = end - start
+            if char == " " and erase and self.capabilities.erase_characters:
+                sequence = f"\x1b[{count}X\x1b[{count}C"
+                if len(sequence) >= count:
+                    continue
+                parts.append(text[last:start])
+            elif self.capabilities.repeat:
+                sequence = f"\x1b[{count - 1}b"
+                if len(sequence) >= (count - 1) * len(char.encode("utf-8")):
+                    continue
+                # REP repeats the character written right before it
+                parts.append(text[last : start + 1])
+            else:
+                continue
+            parts.append(sequence)
+            last = end
+        if not parts:
+            return text
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def _move(self, y: int, x: int) -> str:
+        if self.cursor is not None and self.cursor[0] == y and x > self.cursor[1]:
+            return f"\x1b[{x - self.cursor[1]}C"
+        return f"\x1b[{y + 1};{x + 1}H"
+
+    def _sgr(self, style: int, background: int, foreground: int) -> str:
+        if self.sgr is None:
+            params = ["0"]
+            current_style, current_background, current_foreground = 0, None, None
+        else:
+            params = []
+            current_style, current_background, current_foreground = self.sgr
+
+        if style != current_style:
+            if current_style:
+                params.append(STYLE_OFF[current_style])
+            if style:
+                params.append(STYLE_ON[style])
+        if foreground != current_foreground:
+            params.append(self._color(foreground, 30))
+        if background != current_background:
+            params.append(self._color(background, 40))
+
+        self.sgr = (style, background, foreground)
+        return "\x1b[" + ";".join(params) + "m"
+
+    def _color(self, index: int, base: int) -> str:
+        """SGR parameters of a palette color, base is 30 or 40 for the background."""
+        params = self.colors.get((index, base))
+        if params is None:
+            color = getPaletteColor(index)
+            # 24-bit colors are approximated with the 256 color palette otherwise
+            if color.rgb is not None and self.capabilities.truecolor:
+                params = f"{base + 8};2;{color.rgb[0]};{color.rgb[1]};{color.rgb[2]}"
+            elif color.ansi < 8:
+                params = str(base + color.ansi)
+            elif color.ansi < 16:
+                params = str(base + 60 + color.ansi - 8)
+            else:
+                params = f"{base + 8};5;{color.ansi}"
+            self.colors[(index, base)] = params
+        return params
+
+
+def _incomplete_sequence(data: str) -> bool:
+    """True if data ends with an escape sequence that is missing its final byte."""
+    start = data.rfind("\x1b")
+    if start == -1:
+        return False
+    if start == len(data) - 1:
+        return True
+    if data[start + 1] not in "[O":
+        return False
+    return not any("@" <= char <= "~" for char in data[start + 2 :])
@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+
+
+class Backend:
+    """Device behind a Window.
+
+    The Window keeps the frames and works out which cells changed, a
+    backend only draws the changed spans and reads keys. Styles are the
+    style codes of the frame buffer, colors are palette indices
+    (see rendering.palette).
+    """
+
+    def start(self) -> None:
+        """Prepare the device for drawing."""
+
+    def get_size(self) -> Tuple[int, int]:
+        """Height and width of the device in cells."""
+        raise NotImplementedError
+
+    def resized(self, height: int, width: int) -> bool:
+        """Whether the device is no longer height by width cells."""
+        raise NotImplementedError
+
+    def resize(self) -> Tuple[int, int]:
+        """Adapt to the new size of the device and return it, clearing it."""
+        raise NotImplementedError
+
+    def draw(
+        self, y: int, x: int, text: str, style: int, background: int, foreground: int
+    ) -> None:
+        """Draw a span of text with the same style and colors on one row."""
+        raise NotImplementedError
+
+    def flush(self) -> Optional[int]:
+        """Make everything drawn since the last flush visible.
+
+        Returns the number of bytes sent, None if the backend can't tell.
+        """
+        raise NotImplementedError
+
+    def get_input(self) -> int:
+        """Block until a key is pressed and return its code."""
+        raise NotImplementedError
+
+    def get_keys(self) -> List[int]:
+        """Block until a key is pressed, return it and every key already pending.
+
+        A paste or key repeat then arrives as a single batch.
+        """
+        return [self.get_input()]
+
+    def input_fds(self) -> List[int]:
+        """File descriptors that turn readable when keys are pending.
+
+        Empty if the backend has none, keys are then only read by get_keys.
+        """
+        return []
+
+    def read_keys(self) -> List[int]:
+        """Return the keys that are pending without blocking."""
+        return []
+
+    def hide_cursor(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """Give the device back to the shell."""
@@ -0,0 +1,93 @@
+import curses
+import os
+import re
+import select
+import termios
+import tty
+from typing import Optional
+
+from ..config import CAPABILITY_QUERY_MS
+
+# DEC private mode 2026: the terminal holds back the screen between the
+# begin and end markers and shows the whole frame at once
+SYNC_BEGIN = "\x1b[?2026h"
+SYNC_END = "\x1b[?2026l"
+
+# DECRQM asks whether mode 2026 is known, primary device attributes (DA1)
+# are answered by every terminal and mark the end of the replies
+QUERY = "\x1b[?2026$p\x1b[c"
+DECRQM_REPLY = re.compile(r"\x1b\[\?2026;(\d)\$y")
+DA1_REPLY = re.compile(r"\x1b\[\?[\d;]*c")
+
+
+class Capabilities:
+    """What the terminal supports, detected once at startup."""
+
+    def __init__(
+        self,
+        truecolor: bool = False,
+        synchronized_output: bool = False,
+        repeat: bool = False,
+        erase_characters: bool = False,
+    ):
+        self.truecolor = truecolor
+        self.synchronized_output = synchronized_output
+        # REP repeats the last character, ECH blanks characters in place
+        self.repeat = repeat
+        self.erase_characters = erase_characters
+
+    def __repr__(self) -> str:
+        return (
+            f"Capabilities(truecolor={self.truecolor}, "
+            f"synchronized_output={self.synchronized_output}, "
+            f"repeat={self.repeat}, erase_characters={self.erase_characters})"
+        )
+
+
+def detect_capabilities(input_fd: int, output_fd: int) -> Capabilities:
+    """Detect the capabilities of the terminal on input_fd and output_fd.
+
+    Must run before a backend takes over the terminal, the replies to the
+    queries would otherwise be read as keys.
+    """
+    truecolor = os.environ.get("COLORTERM") in ("truecolor", "24bit")
+    if not (os.isatty(input_fd) and os.isatty(output_fd)):
+        return Capabilities(truecolor=truecolor)
+
+    reply = _query(input_fd, output_fd)
+    match = DECRQM_REPLY.search(reply or "")
+    # 1 and 2 are set and reset, 0 is unknown and 3 and 4 are permanent
+    synchronized_output = match is not None and match.group(1) in "12"
+
+    # terminals don't report these, their terminfo entry does
+    try:
+        curses.setupterm(fd=output_fd)
+        repeat = bool(curses.tigetstr("rep"))
+        erase_characters = bool(curses.tigetstr("ech"))
+    except curses.error:
+        repeat = erase_characters = False
+
+    return Capabilities(
+        truecolor=truecolor,
+        synchronized_output=synchronized_output,
+        repeat=repeat,
+        erase_characters=erase_characters,
+    )
+
+
+def _query(input_fd: int, output_fd: int) -> Optional[str]:
+    """Send QUERY and return the replies, None if the terminal didn't answer."""
+    saved_mode = termios.tcgetattr(input_fd)
+    try:
+        # the replies shouldn't be echoed or wait for a newline
+        tty.setcbreak(input_fd)
+        os.write(output_fd, QUERY.encode())
+        reply = b""
+        while DA1_REPLY.search(reply.decode("latin-1")) is None:
+            ready, _, _ = select.select([input_fd], [], [], CAPABILITY_QUERY_MS / 1000)
+            if not ready:
+                return None
+            reply += os.read(input_fd, 1024)
+        return reply.decode("latin-1")
+    finally:
+        termios.tcsetattr(input_fd, termios.TCSADRAIN, saved_mode)
@@ -0,0 +1,135 @@
+import curses
+import os
+import sys
+from typing import List, Optional, Tuple
+
+from ..config import COLORMAP, ESCAPE_DELAY_MS
+from ..rendering.palette import getPaletteColor
+from .base import Backend
+from .capabilities import SYNC_BEGIN, SYNC_END, Capabilities
+
+# curses attributes for the style codes of the frame buffer
+STYLE_ATTRIBUTES = (curses.A_NORMAL, curses.A_BOLD, curses.A_UNDERLINE)
+
+
+class CursesBackend(Backend):
+    def __init__(self, screen, capabilities=None):
+        self.screen = screen
+        self.capabilities: Capabilities = capabilities or Capabilities()
+        self.buffer = None
+        # curses attributes of each (style, background, foreground)
+        self.attributes = {}
+
+    def start(self) -> None:
+        curses.noecho()
+        self.screen.keypad(True)
+        self.screen.clear()
+
+        # Create a buffer window for double buffering
+        y, x = self.screen.getmaxyx()
+        self.buffer = curses.newwin(y, x)
+        self.buffer.keypad(True)
+
+        self._initialize_colors()
+        curses.set_escdelay(ESCAPE_DELAY_MS)
+
+    def _initialize_colors(self) -> None:
+        """Initialize color pairs for curses."""
+        for background in range(1, 9):
+            for foreground in range(1, 9):
+                key = background * 10 + foreground
+                curses.init_pair(key, COLORMAP[foreground], COLORMAP[background])
+
+    def get_size(self) -> Tuple[int, int]:
+        return self.screen.getmaxyx()
+
+    def resized(self, height: int, width: int) -> bool:
+        # curses only learns about a resize while reading a key, so the
+        # terminal is asked directly
+        return _terminal_size() != (height, width)
+
+    def resize(self) -> Tuple[int, int]:
+        # Get new dimensions
+        y, x = _terminal_size()
+
+        # Clear both screens
+        self.screen.clear()
+        if self.buffer:
+            self.buffer.clear()
+
+        # Resize terminal
+        curses.resizeterm(y, x)
+
+        # Recreate buffer with new dimensions
+        self.buffer = curses.newwin(y, x)
+        self.buffer.keypad(True)
+        return y, x
+
+    def draw(
+        self, y: int, x: int, text: str, style: int, background: int, foreground: int
+    ) -> None:
+        key = (style, background, foreground)
+        attributes = self.attributes.get(key)
+        if attributes is None:
+            # only the named colors have pairs, others use the closest one
+            pair = (
+                getPaletteColor(background).fallback * 10
+                + getPaletteColor(foreground).fallback
+            )
+            attributes = curses.color_pair(pair) | STYLE_ATTRIBUTES[style]
+            self.attributes[key] = attributes
+        try:
+            self.buffer.addnstr(y, x, text, len(text), attributes)
+        except curses.error:
+            pass  # the cursor can't advance past the bottom right corner
+
+    def flush(self) -> Optional[int]:
+        # All windows are staged and written with a single doupdate,
+        # the screen itself is only staged to apply a pending clear
+        self.screen.noutrefresh()
+        self.buffer.noutrefresh()
+        if self.capabilities.synchronized_output:
+            # curses writes the whole update to stdout before doupdate returns
+            os.write(sys.stdout.fileno(), SYNC_BEGIN.encode())
+            curses.doupdate()
+            os.write(sys.stdout.fileno(), SYNC_END.encode())
+        else:
+            curses.doupdate()
+        # curses doesn't tell how much it wrote
+        return None
+
+    def get_input(self) -> int:
+        return self.screen.getch()
+
+    def get_keys(self) -> List[int]:
+        return [self.screen.getch()] + self.read_keys()
+
+    def input_fds(self) -> List[int]:
+        return [sys.stdin.fileno()]
+
+    def read_keys(self) -> List[int]:
+        keys = []
+        # getch returns -1 instead of waiting once the pending keys are read
+        self.screen.nodelay(True)
+        try:
+            while True:
+                key = self.screen.getch()
+                if key == -1:
+                    return keys
+                keys.append(key)
+        finally:
+            self.screen.nodelay(False)
+
+    def hide_cursor(self) -> None:
+        curses.curs_set(False)
+
+    def close(self) -> None:
+        curses.nocbreak()
+        curses.echo()
+        self.screen.keypad(0)
+        curses.endwin()
+
+
+def _terminal_size() -> Tuple[int, int]:
+    size = os.get_terminal_size(sys.stdout.fileno())
+    return size.lines, size.columns
@@ -0,0 +1,139 @@
+import queue
+import time
+from array import array
+from typing import List, Optional, Tuple, Union
+
+from ..config import KEY_RESIZE
+from ..rendering.framebuffer import CHAR_TYPECODE
+from .base import Backend
+
+
+class HeadlessFrame:
+    """What a single flush of the headless backend wrote, and how long it took.
+
+    `duration` is measured from the first draw after the previous flush.
+    """
+
+    def __init__(self, start: float, duration: float, cells: int, bytes: int):
+        self.start = start
+        self.duration = duration
+        self.cells = cells
+        self.bytes = bytes
+
+
+class HeadlessBackend(Backend):
+    """An in-memory terminal, to run the browser without a TTY.
+
+    Drawn cells are kept in a grid that can be read back with row_text and
+    text. Keys are injected with send_keys and every flush is recorded in
+    `frames`.
+    """
+
+    def __init__(self, width: int = 80, height: int = 24):
+        self.width = width
+        self.height = height
+        self.keys: queue.Queue[int] = queue.Queue()
+        self.pending_size: Optional[Tuple[int, int]] = None
+        self.closed = False
+
+        # totals over the lifetime of the backend
+        self.cells_written = 0
+        self.bytes_written = 0
+        self.frames: List[HeadlessFrame] = []
+        self._frame_start: Optional[float] = None
+        self._frame_cells = 0
+        self._frame_bytes = 0
+
+        self._allocate()
+
+    def _allocate(self):
+        size = self.width * self.height
+        self.chars = array(CHAR_TYPECODE, " " * size)
+        self.styles = bytearray(size)
+        self.backgrounds = bytearray(size)
+        self.foregrounds = bytearray(size)
+
+    def send_keys(self, *keys: Union[int, str]):
+        """Queue key codes, or every character of a string, as key presses."""
+        for key in keys:
+            if isinstance(key, str):
+                for char in key:
+                    self.keys.put(ord(char))
+            else:
+                self.keys.put(key)
+
+    def set_size(self, width: int, height: int):
+        """Resize the terminal, the window notices it like a real resize."""
+        self.pending_size = (height, width)
+        self.keys.put(KEY_RESIZE)
+
+    def row_text(self, y: int) -> str:
+        offset = y * self.width
+        return self.chars[offset : offset + self.width].tounicode()
+
+    def text(self) -> str:
+        return "\n".join(self.row_text(y) for y in range(self.height))
+
+    def get_size(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    def resized(self, height: int, width: int) -> bool:
+        return self.pending_size is not None and self.pending_size != (height, width)
+
+    def resize(self) -> Tuple[int, int]:
+        if self.pending_size is not None:
+            self.height, self.width = self.pending_size
+            self.pending_size = None
+        self._allocate()
+        return self.height, self.width
+
+    def draw(
+        self, y: int, x: int, text: str, style: int, background: int, foreground: int
+    ) -> None:
+        if self._frame_start is None:
+            self._frame_start = time.perf_counter()
+
+        start = y * self.width + x
+        end = min(start + len(text), len(self.chars))
+        count = end - start
+        if count <= 0:
+            return
+        self.chars[start:end] = array(CHAR_TYPECODE, text[:count])
+        self.styles[start:end] = bytes((style,)) * count
+        self.backgrounds[start:end] = bytes((background,)) * count
+        self.foregrounds[start:end] = bytes((foreground,)) * count
+
+        written = len(text[:count].encode("utf-8"))
+        self.cells_written += count
+        self.bytes_written += written
+        self._frame_cells += count
+        self._frame_bytes += written
+
+    def flush(self) -> int:
+        now = time.perf_counter()
+        start = self._frame_start if self._frame_start is not None else now
+        written = self._frame_bytes
+        self.frames.append(
+            HeadlessFrame(start, now - start, self._frame_cells, written)
+        )
+        self._frame_start = None
+        self._frame_cells = 0
+        self._frame_bytes = 0
+        return written
+
+    def get_input(self) -> int:
+        return self.keys.get()
+
+    def get_keys(self) -> List[int]:
+        return [self.keys.get()] + self.read_keys()
+
+    def read_keys(self) -> List[int]:
+        keys = []
+        while True:
+            try:
+                keys.append(self.keys.get_nowait())
+            except queue.Empty:
+                return keys
+
+    def close(self) -> None:
+        self.closed = True
@@ -1,18 +1,25 @@
 import os
 import threading
-from time import sleep
+from typing import Optional
 from urllib.parse import parse_qs, quote, urljoin, urlparse
 
 import requests as requests
 import simpleeval
 
 import piko.adom
+from piko.events import LOADED, EventQueue
+from piko.profiler import profiler
 
 
 class Browser:
-    def __init__(self, initialURL: str):
+    def __init__(self, initialURL: str, events: Optional[EventQueue] = None):
         self.document = piko.adom.Document(self)
+        # the loaded documents are posted to it, see finish_load
+        self.events = events
+        # the text of the URL bar, edited as the user types
         self.URL = initialURL
+        # the page that was last opened, the one that is loaded
+        self.requested_url = initialURL
         self.loading = True
         self.context = {}
         self.debugHistory = "Debugger: Press Alt+K to close.\n"
@@ -25,19 +32,46 @@ class Browser:
     def start_load(self):
         if not self.loading:
             return
-        if self.load_thread and self.load_thread.is_alive():
+        # a load is still running, finish_load starts the next one
+        if self.load_thread is not None:
             return
 
-        self.load_thread = threading.Thread(target=self._load_url)
+        self.load_thread = threading.Thread(
+            target=self._load_url, args=(self.begin_load(),)
+        )
         self.load_thread.daemon = True
         self.load_thread.start()
 
-    def _load_url(self):
+    def begin_load(self) -> str:
+        """Prepare loading the requested URL and return it."""
         self.evaluator = (
             self.createEvaluator()
         )  # reset evaluator before new page is loaded
-        self.document = loadFromURL(self.URL, self)
-        sleep(0.2)  # Add a small delay to ensure loading indicator is visible
+        return self.requested_url
+
+    def _load_url(self, URL: str):
+        # runs on the load thread, the document is applied by the main thread
+        document = self.load_document(URL)
+        if self.events is not None:
+            self.events.post(LOADED, (URL, document))
+        else:
+            self.finish_load(URL, document)
+
+    def load_document(self, URL: str) -> piko.adom.Document:
+        """Load the document at URL, off the main thread."""
+        with profiler.trace("load", url=URL):
+            return loadFromURL(URL, self)
+
+    def finish_load(self, URL: str, document: piko.adom.Document):
+        """Show a document loaded from URL."""
+        self.load_thread = None
+        if URL != self.requested_url:
+            # another page was opened meanwhile and is loaded next
+            return
+
+        for error in document.load_errors:
+            self.debug(error)
+        self.document = document
         self.loading = False
         self.scroll = 0
         self.document.call_document_action("start", {})
@@ -63,7 +97,7 @@ class Browser:
         if URL != "piko://exit":
             if URL.startswith("piko://") and not self.URL.startswith("piko://"):
                 self.document = piko.adom.Document(self)
-                self.document.elements.append(
+                self.document.appendElement(
                     piko.adom.createTextElement(
                         "Can not open piko:// links. Only Piko can open these links."
                     )
@@ -75,6 +109,7 @@ class Browser:
                     self.URL = urljoin(self.URL, URL)
                 else:
                     self.URL = URL
+                self.requested_url = self.URL
                 self.loading = True
             return False
         else:
@@ -183,28 +218,33 @@ def loadFromURL(URL: str, browser: Browser):
             stream = open(file_path)
             res = stream.read()
             stream.close()
-            return piko.adom.xml2doc(res, browser)
+            with profiler.trace("xml2doc", url=URL):
+                return piko.adom.xml2doc(res, browser)
         except FileNotFoundError:
             return piko.adom.Document(browser).with_message(
                 f"Could not load `{file_path}`"
             )
     elif protocol == "https://" or protocol == "http://":
-        sleep(0.1)
         try:
             return makeRequest(browser, URL)
         except Exception as e:
-            browser.debug(str(e))
-            return piko.adom.Document(browser).with_message(
-                "Could not load URL. \n" + str(e)
-            )
+            return _failedLoad(browser, e)
 
 
 def makeRequest(browser: Browser, url: str):
     try:
-        page = requests.get(url, headers={"User-Agent": "Piko"}).text
-        return piko.adom.xml2doc(page, browser)
+        with profiler.trace("makeRequest", url=url):
+            page = requests.get(url, headers={"User-Agent": "Piko"}).text
+        with profiler.trace("xml2doc", url=url):
+            return piko.adom.xml2doc(page, browser)
     except Exception as e:
-        browser.debug(str(e))
-        return piko.adom.Document(browser).with_message(
-            "Could not load URL. \n" + str(e)
-        )
+        return _failedLoad(browser, e)
+
+
+def _failedLoad(browser: Browser, error: Exception):
+    document = piko.adom.Document(browser).with_message(
+        "Could not load URL. \n" + str(error)
+    )
+    # runs on the load thread, finish_load adds it to the debug window
+    document.load_errors.append(str(error))
+    return document
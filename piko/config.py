@@ -3,11 +3,42 @@ Configuration module for the terminal browser.
 """
 
 import curses
+import os
 
 # Application settings
 FPS = 60
+# when the terminal drains output slowly (e.g. over SSH) frames are spaced
+# out so a flush takes at most FLUSH_BUDGET of a frame, down to MIN_FPS
+MIN_FPS = 4
+FLUSH_BUDGET = 0.5
 ESCAPE_DELAY_MS = 25
+# how long to wait for the terminal to answer the capability queries at startup
+CAPABILITY_QUERY_MS = 200
 DEBUG_WINDOW_HEIGHT = 8
+# frames the phase timings in the debug window are taken over
+PROFILE_FRAMES = 120
+
+# Terminal output, "curses" or "ansi" (escape sequences written directly,
+# with 256 and 24-bit colors). Can be changed with --backend.
+BACKEND = "curses"
+
+# How input, page loads and frames are scheduled, "threads" or "asyncio"
+# (a single event loop, loads are cancelled when another page is opened).
+# Can be changed with --runtime.
+RUNTIME = "threads"
+
+# Paint the whole document once and scroll by copying rows out of it.
+# Falls back to painting the visible rows when the canvas would be too big.
+DOCUMENT_CANVAS = False
+DOCUMENT_CANVAS_MAX_BYTES = 32 * 1024 * 1024
+
+# Rendered ASCII-art fonts are also kept on disk so they survive restarts
+FONT_DISK_CACHE = True
+FONT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "piko",
+    "fonts",
+)
 
 # UI Elements
 URL_CURSOR = "\N{FULL BLOCK}"
@@ -42,3 +73,4 @@ KEY_BACKSPACE = 127
 KEY_ENTER = 10
 KEY_PASTE = 226  # Alt + V
 KEY_UNFOCUS = 197  # Alt + Q
+KEY_RESIZE = curses.KEY_RESIZE  # sent by the backends when the terminal resizes
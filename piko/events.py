@@ -0,0 +1,51 @@
+"""
+Events that wake the main loop of the terminal browser.
+
+The main thread owns the browser state. Other threads don't change it,
+they post an event that the main thread applies between frames, so a
+frame never sees a half-applied change.
+"""
+
+import queue
+from typing import Any, List, Optional, Tuple
+
+# keys read by the input thread, the data is a list of key codes
+KEYS = "keys"
+# the load thread finished loading a page, the data is (url, document)
+LOADED = "loaded"
+
+Event = Tuple[str, Any]
+
+
+class EventQueue:
+    """Events posted by the input and load threads for the main loop.
+
+    The main loop sleeps in `wait` until something is posted, so an idle
+    browser does no work.
+    """
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+
+    def post(self, event: str, data: Any = None) -> None:
+        self._queue.put((event, data))
+
+    def wait(self, timeout: Optional[float] = None) -> List[Event]:
+        """Block until an event is posted and return every pending event.
+
+        Keys posted one after another are merged into a single KEYS event.
+        Returns an empty list if nothing was posted within `timeout` seconds.
+        """
+        try:
+            events = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return events
+            if event[0] == KEYS and events[-1][0] == KEYS:
+                events[-1] = (KEYS, events[-1][1] + event[1])
+            else:
+                events.append(event)
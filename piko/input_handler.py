@@ -2,23 +2,28 @@
 Input handling module for the terminal browser.
 """
 
-import curses
 import threading
-from typing import Optional
+from typing import List, Optional
 
 import pyperclip
 
+from .adom import Element
 from .browser import Browser
-from .config import VALID_INPUT_CHARS
+from .config import KEY_RESIZE, VALID_INPUT_CHARS
+from .events import KEYS, EventQueue
+from .profiler import profiler
 from .util import remove_spacing
 from .window import Window
 
 
 class InputHandler:
-    def __init__(self, window: Window, browser: Browser):
+    def __init__(self, window: Window, browser: Browser, events: EventQueue):
         self.window = window
         self.browser = browser
+        self.events = events
         self.user_input: Optional[int] = None
+        # input whose change event waits for the end of the batch of keys
+        self.changed_element: Optional[Element] = None
         self.input_thread: Optional[threading.Thread] = None
 
     def start_input_thread(self) -> None:
@@ -30,49 +35,105 @@ class InputHandler:
         self.input_thread.start()
 
     def _input_thread_loop(self) -> None:
-        """Main input handling loop."""
-        while True:
-            self.user_input = self.window.get_input()
+        """Read keys and hand them to the main thread, which applies them.
 
-            # Handle URL bar input first if focused
-            if self.browser.document.focus == -2:
-                self._handle_url_input(chr(self.user_input))
-            # Then handle element input if focused
-            elif self.browser.document.focus != -1:
-                self._handle_element_input(chr(self.user_input))
-            # Then handle special keys if nothing is focused
-            elif self.browser.document.focus == -1:
-                self._handle_special_keys()
-                # Handle link navigation
-                found_index = self.browser.document.find_link(self.user_input)
-                if found_index != -1:
-                    found_link = self.browser.document.links[found_index]
-                    url = found_link.getAttribute("url")
-                    submit = found_link.getAttribute("submit")
-                    if url:
-                        self.window.exiting = self.browser.open_link(url)
-                    elif submit:
-                        self.browser.document.call_action(submit, {})
+        Stops once the browser is exiting, after handing over the keys it
+        was waiting for.
+        """
+        while not self.window.exiting:
+            self.events.post(KEYS, self.window.get_keys())
 
-            self.browser.scroll = max(
-                0,
-                min(
-                    self.browser.scroll,
-                    self.browser.document_size.y - self.window.HEIGHT,
-                ),
-            )
+    def handle_keys(self, keys: List[int]) -> None:
+        """Apply a batch of keys, on the main thread.
+
+        Typing into an input fires its change event once for the batch, so
+        a paste runs the change action once instead of once per character.
+        """
+        with profiler.measure("input"):
+            i = 0
+            while i < len(keys):
+                # characters typed into an input one after another go in at once
+                end = i
+                while end < len(keys) and _is_text(keys[end]):
+                    end += 1
+                if end - i > 1:
+                    focused_element = self.browser.document.get_focused_element()
+                    if focused_element is not None:
+                        text = "".join(map(chr, keys[i:end]))
+                        self._insert_text(focused_element, text)
+                        i = end
+                        continue
+                self.handle_key(keys[i])
+                i += 1
+            self._fire_change()
+
+    def handle_key(self, key: int) -> None:
+        """Apply a key, on the main thread."""
+        self.user_input = key
+        # resizes are picked up by the main loop
+        if self.user_input == KEY_RESIZE:
+            return
+        # anything but typing into an input sees the change applied first
+        if self.browser.document.focus < 0:
+            self._fire_change()
+
+        # Handle URL bar input first if focused
+        if self.browser.document.focus == -2:
+            self._handle_url_input(chr(self.user_input))
+        # Then handle element input if focused
+        elif self.browser.document.focus != -1:
+            self._handle_element_input(chr(self.user_input))
+        # Then handle special keys if nothing is focused
+        elif self.browser.document.focus == -1:
+            self._handle_special_keys()
+            # Handle link navigation
+            found_index = self.browser.document.find_link(self.user_input)
+            if found_index != -1:
+                found_link = self.browser.document.links[found_index]
+                url = found_link.getAttribute("url")
+                submit = found_link.getAttribute("submit")
+                if url:
+                    self.window.exiting = self.browser.open_link(url)
+                elif submit:
+                    self.browser.document.call_action(submit, {})
+
+        self.browser.scroll = max(
+            0,
+            min(
+                self.browser.scroll,
+                self.browser.document_size.y - self.window.HEIGHT,
+            ),
+        )
+
+    def _insert_text(self, element: Element, text: str) -> None:
+        """Insert text at the cursor of an input."""
+        index = element.focus_cursor_index
+        element.value = element.value[:index] + text + element.value[index:]
+        element.focus_cursor_index += len(text)
+        self._changed(element)
+
+    def _changed(self, element: Element) -> None:
+        """Queue the change event of an input until the batch is applied."""
+        if self.changed_element is not element:
+            self._fire_change()
+            self.changed_element = element
+
+    def _fire_change(self) -> None:
+        element = self.changed_element
+        if element is not None:
+            self.changed_element = None
+            self.browser.document.change(element)
 
     def _handle_special_keys(self) -> None:
         """Handle special key inputs."""
         if self.user_input == ord("`") and self.browser.document.focus == -1:
             self.window.exiting = True
-            curses.nocbreak()
-            curses.echo()
-            self.window.screen.keypad(0)
-            curses.endwin()
+            self.window.close()
             exit(0)
         elif self.user_input == 203:  # Alt + K
             self.browser.debugMode = not self.browser.debugMode
+            # phases are only timed while the debug window shows them
+            profiler.enabled = self.browser.debugMode
         elif self.user_input == 9:  # tab
             self.browser.document.focus_next()
         elif self.user_input == 27:  # esc
@@ -221,19 +282,14 @@ class InputHandler:
                     + focused_element.value[old_index:]
                 )
                 focused_element.focus_cursor_index += 1
-                self.browser.document.change(focused_element)
+                self._changed(focused_element)
             else:
                 # Submit for single line inputs
+                self._fire_change()
                 self.browser.document.submit(focused_element)
         elif char in VALID_INPUT_CHARS:
             # Regular character input
-            focused_element.value = (
-                focused_element.value[:old_index]
-                + char
-                + focused_element.value[old_index:]
-            )
-            focused_element.focus_cursor_index += 1
-            self.browser.document.change(focused_element)
+            self._insert_text(focused_element, char)
         elif char == chr(127):  # backspace
             if focused_element.value and old_index > 0:
                 # Check if we're deleting a newline
@@ -273,3 +329,7 @@ class InputHandler:
             self.browser.document.unfocus()
         elif char == chr(9):  # tab to go to next focus
             self.browser.document.focus_next()
+
+
+def _is_text(key: int) -> bool:
+    return key < 0x110000 and chr(key) in VALID_INPUT_CHARS
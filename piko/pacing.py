@@ -0,0 +1,76 @@
+"""
+Frame pacing for terminals that drain output slowly.
+"""
+
+import time
+from typing import Optional
+
+from .config import FLUSH_BUDGET, FPS, MIN_FPS
+
+# weight of the newest frame in the running averages
+SMOOTHING = 0.25
+
+
+class FramePacer:
+    """Spaces frames out so the terminal can keep up with them.
+
+    Writing a frame blocks while the terminal, or the link to it, is still
+    busy with earlier output, so the time a flush takes tells how fast
+    output drains. Frames are held back until a flush only takes
+    FLUSH_BUDGET of the frame interval. Whatever changed in between is
+    drawn by the next frame, so the latest state always wins.
+    """
+
+    def __init__(self, fps: float = FPS, min_fps: float = MIN_FPS):
+        self.min_interval = 1 / fps
+        self.max_interval = 1 / min_fps
+        self.interval = self.min_interval
+        self.last_frame = 0.0
+
+        # running averages over the frames written
+        self.flush_time = 0.0
+        self.frame_bytes: Optional[float] = None
+        self.frame_cells = 0.0
+
+    @property
+    def fps(self) -> float:
+        return 1 / self.interval
+
+    def ready(self) -> bool:
+        """Whether enough time passed since the last frame to write another."""
+        return self.delay() == 0
+
+    def delay(self) -> float:
+        """Seconds until the next frame may be written."""
+        return max(self.last_frame + self.interval - time.perf_counter(), 0.0)
+
+    def record(self, duration: float, cells: int, written: Optional[int]):
+        """Account for a frame of `cells` cells whose flush took `duration`.
+
+        `written` is the number of bytes sent, None if the backend can't tell.
+        """
+        self.flush_time = _average(self.flush_time, duration)
+        self.frame_cells = _average(self.frame_cells, cells)
+        if written is not None:
+            self.frame_bytes = _average(self.frame_bytes or 0.0, written)
+
+        self.interval = min(
+            max(self.flush_time / FLUSH_BUDGET, self.min_interval),
+            self.max_interval,
+        )
+        self.last_frame = time.perf_counter()
+
+    def describe(self) -> str:
+        """One line summary for the debug window."""
+        if self.frame_bytes is not None:
+            size = f"{self.frame_bytes / 1024:.1f} KB/frame"
+        else:
+            size = f"{self.frame_cells:.0f} cells/frame"
+        return (
+            f"{self.fps:.0f}/{1 / self.min_interval:.0f} fps, {size}, "
+            f"flush {self.flush_time * 1000:.1f} ms"
+        )
+
+
+def _average(average: float, value: float) -> float:
+    return average + (value - average) * SMOOTHING
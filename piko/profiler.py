@@ -0,0 +1,150 @@
+"""
+Timing of the phases of a frame, shown in the debug window and traced
+with --trace.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+
+from .config import PROFILE_FRAMES
+from .tracing import Tracer
+
+# the phases in the order they are shown
+PHASES = ("layout", "paint", "flatten", "flush", "input", "script")
+
+
+class Profiler:
+    """Keeps how long each phase took over the last PROFILE_FRAMES frames.
+
+    The time a phase takes is added up over a frame, each frame is then
+    one sample per phase that ran. Input includes the scripts the keys
+    run. With a tracer, phases and the spans passed to `trace` are also
+    recorded in the trace. Nothing is timed while disabled and not
+    tracing, a phase then costs two attribute checks.
+    """
+
+    def __init__(self, frames: int = PROFILE_FRAMES):
+        self.enabled = False
+        self.samples: Dict[str, Deque[float]] = {
+            phase: deque(maxlen=frames) for phase in PHASES
+        }
+        # time each phase took so far in the current frame
+        self.frame: Dict[str, float] = {}
+        # phases being timed, a script calling another is timed once
+        self.running: Set[str] = set()
+        self.tracer: Optional[Tracer] = None
+
+    def measure(self, phase: str, **args):
+        """Context manager that adds the time spent in it to `phase`.
+
+        Phases are measured on the main thread, `args` are shown with the
+        span in the trace.
+        """
+        if not self.enabled and self.tracer is None:
+            return NOT_MEASURED
+        return _Span(self, phase, args, True)
+
+    def trace(self, name: str, **args):
+        """Context manager that records a span in the trace, on any thread."""
+        if self.tracer is None:
+            return NOT_MEASURED
+        return _Span(self, name, args, False)
+
+    def trace_element(self, name: str, element, y: int):
+        """`trace` for the subtree of a top level element at row y.
+
+        The span is named after the element type and id, so a slow part of
+        the page can be told apart from the rest.
+        """
+        if self.tracer is None:
+            return NOT_MEASURED
+        args = {"type": element.type, "y": y}
+        element_id = element.getAttribute("id")
+        if element_id is not None:
+            args["id"] = element_id
+            name = f"{name} {element.type}#{element_id}"
+        else:
+            name = f"{name} {element.type}"
+        return _Span(self, name, args, False)
+
+    def add(self, phase: str, duration: float) -> None:
+        self.frame[phase] = self.frame.get(phase, 0.0) + duration
+
+    def end_frame(self) -> None:
+        """Turn the times of the current frame into samples."""
+        for phase, duration in self.frame.items():
+            self.samples[phase].append(duration)
+        self.frame = {}
+
+    def reset(self) -> None:
+        """Forget the samples taken so far."""
+        for samples in self.samples.values():
+            samples.clear()
+        self.frame = {}
+
+    def describe(self) -> str:
+        """One line summary of p50/p95/max in milliseconds, for the debug window."""
+        parts = []
+        for phase in PHASES:
+            samples = sorted(self.samples[phase])
+            if samples:
+                parts.append(
+                    f"{phase} {_ms(_percentile(samples, 0.5))}/"
+                    f"{_ms(_percentile(samples, 0.95))}/{_ms(samples[-1])}"
+                )
+        if not parts:
+            return "p50/p95/max ms: no frames timed yet"
+        return "p50/p95/max ms: " + "  ".join(parts)
+
+
+class _Span:
+    def __init__(self, profiler: Profiler, name: str, args: dict, phase: bool):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        # only the outermost span of a phase counts towards its time
+        self.counted = phase and name not in profiler.running
+        self.start: Optional[float] = None
+
+    def __enter__(self):
+        if self.counted:
+            self.profiler.running.add(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.start
+        profiler = self.profiler
+        if self.counted:
+            profiler.running.discard(self.name)
+            if profiler.enabled:
+                profiler.add(self.name, duration)
+        if profiler.tracer is not None:
+            profiler.tracer.add(self.name, self.start, duration, self.args)
+        return False
+
+
+class _NotMeasured:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NOT_MEASURED = _NotMeasured()
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}"
+
+
+# shared by the renderer, the window, the input handler, documents and
+# the browser
+profiler = Profiler()
@@ -2,19 +2,27 @@
 Rendering module for the terminal browser.
 """
 
-import curses
+from typing import Optional
 
 from .browser import Browser
-from .config import CHECK_MARK, DEBUG_WINDOW_HEIGHT, LOADING_MARK, URL_CURSOR
-from .pieces import get_pieces
-from .rendering.render import renderDebugger, renderDocument
-from .util import (
-    cursor_centered_text,
-    expand_len,
-    rcaplen,
-    remove_spacing,
-    restrict_len,
+from .config import (
+    CHECK_MARK,
+    DEBUG_WINDOW_HEIGHT,
+    DOCUMENT_CANVAS,
+    DOCUMENT_CANVAS_MAX_BYTES,
+    LOADING_MARK,
+    URL_CURSOR,
 )
+from .profiler import profiler
+from .rendering.framebuffer import FrameBuffer
+from .rendering.render import (
+    renderDebugger,
+    renderDocument,
+    renderDocumentCanvas,
+    renderFromCanvas,
+)
+from .rendering.style_constants import STYLE_CODES
+from .util import cursor_centered_text, expand_len, rcaplen
 from .window import Window
 
 
@@ -22,6 +30,10 @@ class Renderer:
     def __init__(self, window: Window, browser: Browser):
         self.window = window
         self.browser = browser
+        self.frame = FrameBuffer(window.WIDTH, window.HEIGHT)
+        # whole-document canvas used when DOCUMENT_CANVAS is enabled
+        self.canvas: Optional[FrameBuffer] = None
+        self.canvas_stale = True
         self.reset_state_cache()
 
     def reset_state_cache(self):
@@ -31,55 +43,66 @@ class Renderer:
         self.last_scroll = None
         self.last_focus = None
         self.last_cursor_index = None
-        self.last_document_hash = None
-        self.last_input_values = {}
-        self.last_input_cursors = {}
+        self.last_document = None
+        self.last_document_version = None
+        self.last_debug_mode = None
+        self.last_debug_length = None
 
     def _should_render(self) -> bool:
         """Determine if we need to render based on state changes."""
-        current_doc_hash = hash(str(self.browser.document.elements))
-
-        # Track input element values and cursor positions
-        current_input_values = {}
-        current_input_cursors = {}
-        for element in self.browser.document.get_focus_list():
-            element_id = id(element)  # Use object id as unique identifier
-            current_input_values[element_id] = element.value
-            current_input_cursors[element_id] = element.focus_cursor_index
+        document = self.browser.document
+
+        # changes to what the document looks like, as opposed to the URL bar
+        # or the scroll position, invalidate the document canvas. Every
+        # change to the elements, values and cursors bumps the version.
+        document_changed = (
+            document is not self.last_document
+            or document.version != self.last_document_version
+            or self.last_focus != document.focus
+        )
+        if document_changed:
+            self.canvas_stale = True
 
         needs_render = (
-            self.last_url != self.browser.URL
+            document_changed
+            or self.last_url != self.browser.URL
             or self.last_loading != self.browser.loading
             or self.last_scroll != self.browser.scroll
-            or self.last_focus != self.browser.document.focus
             or self.last_cursor_index != self.browser.cursor_index
-            or self.last_document_hash != current_doc_hash
-            or self.last_input_values != current_input_values
-            or self.last_input_cursors != current_input_cursors
+            # the debug window opened, closed or got a new line
+            or self.last_debug_mode != self.browser.debugMode
+            or self.last_debug_length != len(self.browser.debugHistory)
         )
 
         # Update cached state
         self.last_url = self.browser.URL
         self.last_loading = self.browser.loading
         self.last_scroll = self.browser.scroll
-        self.last_focus = self.browser.document.focus
+        self.last_focus = document.focus
         self.last_cursor_index = self.browser.cursor_index
-        self.last_document_hash = current_doc_hash
-        self.last_input_values = current_input_values
-        self.last_input_cursors = current_input_cursors
+        self.last_document = document
+        self.last_document_version = document.version
+        self.last_debug_mode = self.browser.debugMode
+        self.last_debug_length = len(self.browser.debugHistory)
 
         return needs_render
 
-    def render(self, force: bool = False) -> None:
-        """Main rendering function with optimizations."""
-        if not force and not self._should_render():
-            return
+    def render(self, force: bool = False) -> bool:
+        """Main rendering function with optimizations.
+
+        Returns True if a frame was rendered.
+        """
+        if force:
+            self.canvas_stale = True
+        elif not self._should_render():
+            return False
 
         self.window.start_render(0, 0)
         self._render_url_bar()
         self._render_document()
         self._render_debugger()
         self.window.disable_cursor()
+        return True
 
     def _render_url_bar(self) -> None:
         """Render the URL bar at the top of the screen."""
@@ -117,52 +140,86 @@ class Renderer:
 
         # Render URL with styles
         url_focused = self.browser.document.focus == -2
-        url_style = curses.A_BOLD if url_focused else curses.A_UNDERLINE
+        url_style = STYLE_CODES["bold" if url_focused else "underline"]
         self.window.render(
             render_url,
             url_style,
-            [1 if url_focused else 2] * len(render_url),
-            [2 if url_focused else 1] * len(render_url),
+            1 if url_focused else 2,
+            2 if url_focused else 1,
         )
 
         # Render status indicator
         self.window.render(
             CHECK_MARK if not self.browser.loading else LOADING_MARK,
-            curses.A_UNDERLINE,
-            [1] * 2,
-            [2] * 2,
+            STYLE_CODES["underline"],
+            1,
+            2,
         )
 
     def _render_document(self) -> None:
         """Render the main document content with optimizations."""
-        output, styles, backgrounds, foregrounds, calculated_size = renderDocument(
-            self.browser.document,
-            self.window.WIDTH,
-            self.window.HEIGHT,
-            self.browser.scroll,
-        )
-        self.browser.document_size = calculated_size
-
-        # Flatten color arrays once
-        backgrounds_flattened = [item for sublist in backgrounds for item in sublist]
-        foregrounds_flattened = [item for sublist in foregrounds for item in sublist]
-
-        # Process output string once
-        output = restrict_len(
-            remove_spacing(output), self.window.WIDTH * (self.window.HEIGHT - 1) - 1
-        )
+        # The frame buffer is only reallocated when the terminal size changes
+        self.frame.resize(self.window.WIDTH, self.window.HEIGHT)
+        if not DOCUMENT_CANVAS or not self._render_from_canvas():
+            self.browser.document_size = renderDocument(
+                self.browser.document, self.frame, self.browser.scroll
+            )
 
-        # Get render pieces and batch render them
-        render_pieces = get_pieces(styles, len(output))
+        # The document fills the rows below the URL bar, except the bottom right
+        # cell, writing to it would scroll the screen
+        rows = min(self.window.HEIGHT - 1, self.frame.height)
         self.window.start_render(1, 0)
 
-        for piece in render_pieces:
-            start_pos, end_pos, col = piece
-            partial_backgrounds = backgrounds_flattened[start_pos:end_pos]
-            partial_foregrounds = foregrounds_flattened[start_pos:end_pos]
-            self.window.render(
-                output[start_pos:end_pos], col, partial_backgrounds, partial_foregrounds
+        with profiler.measure("flatten"):
+            # runs continue across rows when the attributes match, so a plain
+            # screen is written in a handful of calls
+            text = []
+            attributes = None
+            for y in range(rows):
+                line = self.frame.rowText(y)
+                if y == rows - 1:
+                    line = line[:-1]
+                for run in self.frame.rowRuns(y):
+                    run_attributes = (run.style, run.background, run.foreground)
+                    if run_attributes != attributes:
+                        self._render_run(text, attributes)
+                        text = []
+                        attributes = run_attributes
+                    text.append(line[run.start : run.end])
+            self._render_run(text, attributes)
+
+    def _render_run(self, text: list, attributes: Optional[tuple]) -> None:
+        run = "".join(text)
+        if run:
+            style, background, foreground = attributes
+            self.window.render(run, style, background, foreground)
+
+    def _render_from_canvas(self) -> bool:
+        """Scroll by copying rows out of a whole-document canvas.
+
+        The canvas is only repainted when something other than the scroll
+        position changed. Returns False if the document is too big for one.
+        """
+        if self.canvas is None or self.canvas_stale:
+            canvas = self.canvas or FrameBuffer(0, 0)
+            document_size = renderDocumentCanvas(
+                self.browser.document,
+                canvas,
+                self.window.WIDTH,
+                self.window.HEIGHT,
+                DOCUMENT_CANVAS_MAX_BYTES,
             )
+            if document_size is None:
+                self.canvas = None
+                return False
+            self.canvas = canvas
+            self.canvas_stale = False
+            self.browser.document_size = document_size
+
+        renderFromCanvas(
+            self.browser.document, self.canvas, self.frame, self.browser.scroll
+        )
+        return True
 
     def _render_debugger(self) -> None:
         """Render the debug window if debug mode is enabled."""
@@ -170,10 +227,14 @@ class Renderer:
             return
 
         self.window.start_render(self.window.HEIGHT - DEBUG_WINDOW_HEIGHT, 0)
-        debugged = renderDebugger(
-            self.browser.debugHistory, self.window.WIDTH, DEBUG_WINDOW_HEIGHT
-        )[:-1]
-
-        self.window.render(
-            debugged, curses.A_NORMAL, [2] * len(debugged), [1] * len(debugged)
+        # the first rows show how fast frames are going out and where the
+        # time of a frame goes
+        debugged = (
+            renderDebugger(self.window.pacer.describe(), self.window.WIDTH, 1)
+            + renderDebugger(profiler.describe(), self.window.WIDTH, 1)
+            + renderDebugger(
+                self.browser.debugHistory, self.window.WIDTH, DEBUG_WINDOW_HEIGHT - 2
+            )[:-1]
         )
+
+        self.window.render(debugged, STYLE_CODES["normal"], 2, 1)
@@ -1,162 +1,143 @@
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Tuple
+
 from ..vector import Vec
 from .borders import getBorderCodes
+from .framebuffer import FrameBuffer
 
+# number of distinct (type, width) border strips kept in memory
+BORDER_CACHE_SIZE = 512
 
-def renderBorder(type: str, pos: Vec, size: Vec, res):
-    screenSize = Vec(len(res.rows[0]), len(res.rows))
-    borderCodes = getBorderCodes(type)
 
-    # any of border visible
-    if pos.y >= len(res.rows):
-        return
+class BorderStrips:
+    """Lines of a border around content `width` cells wide."""
+
+    def __init__(self, type: str, width: int):
+        borderCodes = getBorderCodes(type)
+        self.top = (
+            borderCodes["top-left"]
+            + borderCodes["top"] * width
+            + borderCodes["top-right"]
+        )
+        self.bottom = (
+            borderCodes["bottom-left"]
+            + borderCodes["bottom"] * width
+            + borderCodes["bottom-right"]
+        )
+        self.left = borderCodes["left"]
+        self.right = borderCodes["right"]
 
-    # first row
-    if pos.y >= 0:
-        firstRow = ""
 
-        # margin
-        firstRow += res.rows[pos.y][0 : pos.x]
+class TableBorderStrips:
+    """Lines of a table grid with the given column widths.
 
-        # top left corner
-        firstRow += borderCodes["top-left"]
-        # top
-        firstRow += borderCodes["top"] * size.x
-        # top right corner
-        firstRow += borderCodes["top-right"]
+    Separator offsets are relative to the left edge of the table.
+    """
 
-        firstRow += res.rows[pos.y][pos.x + 1 + size.x + 1 : screenSize.x]
+    def __init__(self, type: str, col_widths: Tuple[int, ...]):
+        borderCodes = getBorderCodes(type)
 
-        # establish first row
-        res.rows[pos.y] = (
-            firstRow if len(firstRow) <= screenSize.x else firstRow[: screenSize.x]
-        )
+        def line(left: str, fill: str, intersect: str, right: str) -> str:
+            return left + intersect.join(fill * width for width in col_widths) + right
 
-    # middle rows
-    for y in range(size.y):
-        borderContentY = pos.y + 1 + y
-        if borderContentY < len(res.rows) and borderContentY >= 0:
-            newRow = res.rows[borderContentY][0 : pos.x]
-            newRow += borderCodes["left"]
-            newRow += res.rows[borderContentY][pos.x + 1 : pos.x + 1 + size.x]
-            newRow += borderCodes["right"]
-            newRow += res.rows[borderContentY][pos.x + 1 + size.x + 1 : screenSize.x]
-            res.rows[borderContentY] = (
-                newRow if len(newRow) <= screenSize.x else newRow[: screenSize.x]
-            )
-
-    # last row
-    lastBorderContentY = pos.y + size.y + 1
-    if lastBorderContentY < len(res.rows) and lastBorderContentY >= 0:
-        lastRow = ""
-        # margin
-        lastRow += res.rows[lastBorderContentY][0 : pos.x]
-
-        # bottom left corner
-        lastRow += borderCodes["bottom-left"]
-        # bottom
-        lastRow += borderCodes["bottom"] * size.x
-        # bottom right corner
-        lastRow += borderCodes["bottom-right"]
-
-        lastRow += res.rows[lastBorderContentY][pos.x + 1 + size.x + 1 : screenSize.x]
-
-        # establish last row
-        res.rows[lastBorderContentY] = (
-            lastRow if len(lastRow) <= screenSize.x else lastRow[: screenSize.x]
+        self.top = line(
+            borderCodes["top-left"],
+            borderCodes["top"],
+            borderCodes["top-intersect"],
+            borderCodes["top-right"],
+        )
+        self.separator = line(
+            borderCodes["left-intersect"],
+            borderCodes["top"],
+            borderCodes["middle-intersect"],
+            borderCodes["right-intersect"],
         )
+        self.bottom = line(
+            borderCodes["bottom-left"],
+            borderCodes["bottom"],
+            borderCodes["bottom-intersect"],
+            borderCodes["bottom-right"],
+        )
+        self.left = borderCodes["left"]
+        self.right = borderCodes["right"]
+
+        # the same column separators are drawn on every content row
+        self.separatorOffsets: List[int] = []
+        offset = 0
+        for width in col_widths[:-1]:
+            offset += width + 1
+            self.separatorOffsets.append(offset)
+        self.rightOffset = len(self.top) - 1
+
+
+@lru_cache(maxsize=BORDER_CACHE_SIZE)
+def getBorderStrips(type: str, width: int) -> BorderStrips:
+    return BorderStrips(type, width)
+
+
+@lru_cache(maxsize=BORDER_CACHE_SIZE)
+def getTableBorderStrips(type: str, col_widths: Tuple[int, ...]) -> TableBorderStrips:
+    return TableBorderStrips(type, col_widths)
+
+
+def renderBorder(type: str, pos: Vec, size: Vec, res: FrameBuffer):
+    # any of border visible
+    if pos.y >= res.height:
+        return
+
+    strips = getBorderStrips(type, size.x)
+
+    res.write(pos.x, pos.y, strips.top)
+    res.writeColumn(pos.x, pos.y + 1, strips.left, size.y)
+    res.writeColumn(pos.x + 1 + size.x, pos.y + 1, strips.right, size.y)
+    res.write(pos.x, pos.y + size.y + 1, strips.bottom)
 
 
 def renderTableBorder(
-    type: str, pos: Vec, col_widths: list[int], row_heights: list[int], res
+    type: str,
+    pos: Vec,
+    col_widths: list[int],
+    row_heights: list[int],
+    row_offsets: list[int],
+    res: FrameBuffer,
 ):
-    screenSize = Vec(len(res.rows[0]), len(res.rows))
-    borderCodes = getBorderCodes(type)
-
-    current_y = pos.y
-    total_width = (
-        sum(col_widths) + len(col_widths) + 1
-    )  # column widths + separators + outer borders
-
-    # Render top border
-    if current_y >= 0:
-        top_row = res.rows[current_y][0 : pos.x]
-        top_row += borderCodes["top-left"]
-
-        for i, width in enumerate(col_widths):
-            top_row += borderCodes["top"] * width
-            if i < len(col_widths) - 1:
-                top_row += borderCodes["top-intersect"]
-
-        top_row += borderCodes["top-right"]
-        top_row += res.rows[current_y][pos.x + total_width : screenSize.x]
-        res.rows[current_y] = (
-            top_row if len(top_row) <= screenSize.x else top_row[: screenSize.x]
-        )
-        current_y += 1
+    """Draw the grid of a table, only for the rows that land on the screen.
+
+    `row_offsets` is the first content row of each table row relative to
+    `pos.y`, as computed by the table layout.
+    """
+    if not row_heights:
+        return
+
+    last_row = len(row_heights) - 1
+    bottom_y = pos.y + row_offsets[last_row] + row_heights[last_row]
+
+    # any of border visible
+    if pos.y >= res.height or bottom_y < 0:
+        return
+
+    strips = getTableBorderStrips(type, tuple(col_widths))
+    separator_xs = [pos.x + offset for offset in strips.separatorOffsets]
+
+    res.write(pos.x, pos.y, strips.top)
+
+    # skip the rows above the screen, row offsets are sorted
+    first_row = max(bisect_right(row_offsets, -pos.y) - 1, 0)
+    for row_idx in range(first_row, len(row_heights)):
+        row_y = pos.y + row_offsets[row_idx]
+        if row_y >= res.height:
+            return
+        height = row_heights[row_idx]
 
-    # Render rows and their separators
-    for row_idx, height in enumerate(row_heights):
         # Content rows
-        for _ in range(height):
-            if current_y >= len(res.rows) or current_y < 0:
-                break
-
-            content_row = res.rows[current_y][0 : pos.x]
-            content_row += borderCodes["left"]
-
-            current_x = pos.x + 1
-            for i, width in enumerate(col_widths):
-                content_row += res.rows[current_y][current_x : current_x + width]
-                current_x += width
-                if i < len(col_widths) - 1:
-                    content_row += borderCodes["left"]
-
-            content_row += borderCodes["right"]
-            content_row += res.rows[current_y][pos.x + total_width : screenSize.x]
-            res.rows[current_y] = (
-                content_row
-                if len(content_row) <= screenSize.x
-                else content_row[: screenSize.x]
-            )
-            current_y += 1
+        res.writeColumn(pos.x, row_y, strips.left, height)
+        for x in separator_xs:
+            res.writeColumn(x, row_y, strips.left, height)
+        res.writeColumn(pos.x + strips.rightOffset, row_y, strips.right, height)
 
         # Row separator (not after last row)
-        if (
-            row_idx < len(row_heights) - 1
-            and current_y < len(res.rows)
-            and current_y >= 0
-        ):
-            separator_row = res.rows[current_y][0 : pos.x]
-            separator_row += borderCodes["left-intersect"]
-
-            for i, width in enumerate(col_widths):
-                separator_row += borderCodes["top"] * width
-                if i < len(col_widths) - 1:
-                    separator_row += borderCodes["middle-intersect"]
-
-            separator_row += borderCodes["right-intersect"]
-            separator_row += res.rows[current_y][pos.x + total_width : screenSize.x]
-            res.rows[current_y] = (
-                separator_row
-                if len(separator_row) <= screenSize.x
-                else separator_row[: screenSize.x]
-            )
-            current_y += 1
-
-    # Render bottom border
-    if current_y < len(res.rows) and current_y >= 0:
-        bottom_row = res.rows[current_y][0 : pos.x]
-        bottom_row += borderCodes["bottom-left"]
-
-        for i, width in enumerate(col_widths):
-            bottom_row += borderCodes["bottom"] * width
-            if i < len(col_widths) - 1:
-                bottom_row += borderCodes["bottom-intersect"]
-
-        bottom_row += borderCodes["bottom-right"]
-        bottom_row += res.rows[current_y][pos.x + total_width : screenSize.x]
-        res.rows[current_y] = (
-            bottom_row
-            if len(bottom_row) <= screenSize.x
-            else bottom_row[: screenSize.x]
-        )
+        if row_idx < last_row:
+            res.write(pos.x, row_y + height, strips.separator)
+
+    res.write(pos.x, bottom_y, strips.bottom)
@@ -1,3 +1,8 @@
+from functools import lru_cache
+
+
+# the codes of a type never change, the returned dict is shared and read-only
+@lru_cache(maxsize=None)
 def getBorderCodes(type: str) -> dict:
     # defaults are for 'line'
     codes = {
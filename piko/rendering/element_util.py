@@ -1,40 +1,141 @@
+from typing import List
+
 from ..adom import Element
-from ..vector import Vec
+from ..vector import Vec, cloneVec
 from .text_util import getLinkText, getRenderedFont, getWrapAndSize
 from .util import getDefinedSize, getDirection, getPadding, parseSize
 
+# number of available sizes remembered per element before its cache is reset
+LAYOUT_CACHE_SIZE = 8
+
+_MISSING = object()
+
+
+def cacheLayout(element: Element, key: tuple, compute):
+    cache = element.layout_cache
+    res = cache.get(key, _MISSING)
+    if res is _MISSING:
+        if len(cache) >= LAYOUT_CACHE_SIZE:
+            cache.clear()
+        res = compute()
+        cache[key] = res
+    return res
+
 
 def getAlignOffset(element: Element, val: str, parentSize: Vec) -> int:
-    if element.type == "link":
-        val = getLinkText(element)
+    align = element.getAttribute("align")
+    if align != "center" and align != "right":
+        return 0
 
     isBox = element.type == "input"
 
-    align = element.getAttribute("align")
+    if align == "center" and isBox:
+        defWidth = getDefinedSize(element, parentSize).x
+        finalWidth = defWidth if defWidth != -1 else parentSize.x
+    elif isBox:
+        # input text changes with every keystroke, so it is not cached
+        finalWidth = _getWrappedWidth(element, val, parentSize)
+    else:
+        # the text of every other element is derived from the element itself
+        finalWidth = cacheLayout(
+            element,
+            ("align", parentSize.x, parentSize.y),
+            lambda: _getWrappedWidth(element, val, parentSize),
+        )
+
+    if align == "center":
+        return round(float(parentSize.x) / 2.0) - round(float(finalWidth) / 2.0)
+    return parentSize.x - finalWidth
+
+
+def _getWrappedWidth(element: Element, val: str, parentSize: Vec) -> int:
+    if element.type == "link":
+        val = getLinkText(element)
+
     defWidth = getDefinedSize(element, parentSize).x
     preserve_whitespace = (
         element.getAttribute("preserve") == "true" if element.type == "text" else False
     )
+    wrapped = getWrapAndSize(
+        val, defWidth if defWidth != -1 else parentSize.x, preserve_whitespace
+    )
+    return wrapped["size"].x
+
+
+class TableLayout:
+    """Rows, column widths and row heights of a table.
+
+    Offsets are relative to the top left corner of the table's border.
+    """
+
+    def __init__(self, rows: List[Element], cells: List[List[Element]]):
+        self.rows = rows
+        self.cells = cells
+        self.columnWidths: List[int] = []
+        self.rowHeights: List[int] = []
+        # first content row of every table row, after the border line above it
+        self.rowOffsets: List[int] = []
+        self.size = Vec(0, 0)
+
+    def finish(self):
+        offset = 1
+        for height in self.rowHeights:
+            self.rowOffsets.append(offset)
+            offset += height + 1
+        if self.rows:
+            self.size = Vec(sum(self.columnWidths) + len(self.columnWidths) + 1, offset)
+
+
+def getTableLayout(table: Element, parentSize: Vec) -> TableLayout:
+    """Measure every cell of a table once, cached per available size."""
+    return cacheLayout(
+        table,
+        ("table", parentSize.x, parentSize.y),
+        lambda: _measureTable(table, parentSize),
+    )
 
-    finalWidth = defWidth if defWidth != -1 else parentSize.x
-    if not isBox:
-        wrapped = getWrapAndSize(
-            val, defWidth if defWidth != -1 else parentSize.x, preserve_whitespace
-        )
-        finalWidth = wrapped["size"].x
-    if align == "center":
-        return round(float(parentSize.x) / 2.0) - round(float(finalWidth) / 2.0)
-    if align == "right":
-        wrapped = getWrapAndSize(
-            val, defWidth if defWidth != -1 else parentSize.x, preserve_whitespace
-        )
-        finalWidth = wrapped["size"].x
-        return parentSize.x - finalWidth
-    return 0
+
+def _measureTable(table: Element, parentSize: Vec) -> TableLayout:
+    rows = [x for x in table.children if x.type == "row"]
+    layout = TableLayout(rows, [])
+    columnWidths = layout.columnWidths
+
+    for row in rows:
+        rowCells = [x for x in row.children if x.type == "cell"]
+        rowHeight = 1
+        for j, cell in enumerate(rowCells):
+            cellSize = getElementSize(cell, parentSize)
+            if j == len(columnWidths):
+                columnWidths.append(1)
+            columnWidths[j] = max(columnWidths[j], cellSize.x)
+            rowHeight = max(rowHeight, cellSize.y)
+        layout.cells.append(rowCells)
+        layout.rowHeights.append(rowHeight)
+
+    layout.finish()
+    return layout
 
 
 def getElementSize(element: Element, parentSize: Vec) -> Vec:
+    """Size of an element given the space available to it.
+
+    Results are cached on the element per available size and dropped when
+    the element or one of its descendants changes (see Element.invalidate).
+    """
+    size = cacheLayout(
+        element,
+        (parentSize.x, parentSize.y),
+        lambda: _measureElement(element, parentSize),
+    )
+    # callers are free to modify the returned vector
+    return cloneVec(size) if size is not None else None
+
+
+def _measureElement(element: Element, parentSize: Vec) -> Vec:
     if element.type == "text":
+        # empty text still takes up a line
+        if not element.value:
+            return Vec(0, 1)
         widthAttr = element.getAttribute("width")
         padding = getPadding(element, parentSize.x, parentSize.y)
         renderWidth = (
@@ -43,10 +144,12 @@ def getElementSize(element: Element, parentSize: Vec) -> Vec:
             else parentSize.x - padding["left"] - padding["right"]
         )
         preserve_whitespace = element.getAttribute("preserve") == "true"
-        val = getRenderedFont(
-            element.value, preserve_whitespace, element.getAttribute("font")
+        font = element.getAttribute("font")
+        val = getRenderedFont(element.value, preserve_whitespace, font)
+        # fonts are laid out with whitespace preserved, same as when rendered
+        wrapped_text_size = getWrapAndSize(
+            val, renderWidth, True if font is not None else preserve_whitespace
         )
-        wrapped_text_size = getWrapAndSize(val, renderWidth, preserve_whitespace)
         res = wrapped_text_size["size"]
         res.x += padding["left"] + padding["right"]
         res.y += padding["top"] + padding["bottom"]
@@ -111,43 +214,14 @@ def getElementSize(element: Element, parentSize: Vec) -> Vec:
     elif element.type == "br":
         return Vec(1, 1)
     elif element.type == "table":
-        childrenSize = Vec(0, 0)
         defSize = getDefinedSize(element, parentSize)
-        hasDefWidth = defSize.x != -1
-        hasDefHeight = defSize.y != -1
+        gridSize = getTableLayout(element, parentSize).size
 
-        tableRows = [x for x in element.children if x.type == "row"]
-
-        # get column widths by getting max width of cells in each column
-        rowWithMostCells = max(
-            tableRows, key=lambda x: len([x for x in x.children if x.type == "cell"])
-        )
-        columnWidths = [1] * len(
-            [x for x in rowWithMostCells.children if x.type == "cell"]
+        # the size of a table includes its border, a defined size is the whole table
+        return Vec(
+            defSize.x if defSize.x != -1 else gridSize.x,
+            defSize.y if defSize.y != -1 else gridSize.y,
         )
-        rowHeights = [1] * len(tableRows)
-
-        for row in tableRows:
-            rowCells = [x for x in row.children if x.type == "cell"]
-            for i, cell in enumerate(rowCells):
-                cellSize = getElementSize(cell, parentSize)
-                columnWidths[i] = max(columnWidths[i], cellSize.x)
-            rowHeights[i] = max(rowHeights[i], cellSize.y)
-
-        childrenSize.x = (
-            sum(columnWidths) + len(columnWidths) - 1
-        )  # account for borders
-        childrenSize.y = sum(rowHeights) + len(rowHeights) - 1  # account for borders
-
-        res = Vec(
-            defSize.x if hasDefWidth else childrenSize.x,
-            defSize.y if hasDefHeight else childrenSize.y,
-        )
-
-        # enforce box-sizing
-        res.add(-2 if hasDefWidth else 0, -2 if hasDefHeight else 0)
-
-        return res
     elif element.type == "cell":
         childrenSize = Vec(0, 0)
         padding = getPadding(element, parentSize.x, parentSize.y)
@@ -0,0 +1,59 @@
+import hashlib
+import os
+from functools import lru_cache
+
+import art
+from art import text2art
+
+from ..config import FONT_CACHE_DIR, FONT_DISK_CACHE
+
+# number of distinct (text, font) renders kept in memory
+FONT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def renderFont(text: str, font: str) -> str:
+    """Render text with an ASCII-art font.
+
+    Results are cached in memory and, if enabled, in FONT_CACHE_DIR so a
+    banner is only rendered once per text, font and art version.
+    """
+    path = _getCachePath(text, font) if FONT_DISK_CACHE else None
+    if path is not None:
+        try:
+            with open(path, encoding="utf-8") as stream:
+                return stream.read()
+        except OSError:
+            pass
+
+    rendered = text2art(text, font=font).rstrip()
+
+    if path is not None:
+        _store(path, rendered)
+    return rendered
+
+
+def getFontCacheInfo():
+    """Hit/miss counters of the in-memory font cache."""
+    return renderFont.cache_info()
+
+
+def _getCachePath(text: str, font: str) -> str:
+    key = "\0".join((art.__version__, font, text)).encode("utf-8")
+    return os.path.join(FONT_CACHE_DIR, hashlib.sha1(key).hexdigest() + ".txt")
+
+
+def _store(path: str, rendered: str):
+    # write to a temporary file first so readers never see a partial render
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as stream:
+            stream.write(rendered)
+        os.replace(temp_path, path)
+    except OSError:
+        # the disk cache is an optimization, an unwritable cache dir is fine
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,142 @@
+from array import array, typecodes
+from typing import List
+
+from .style import StyleRun
+
+# "w" (UCS-4) replaces the deprecated "u" typecode on newer Pythons
+CHAR_TYPECODE = "w" if "w" in typecodes else "u"
+
+
+class FrameBuffer:
+    """Fixed-size grid of terminal cells.
+
+    Characters, background, foreground and style indices are kept in flat
+    planes indexed by `y * width + x`, so rows can be written with a single
+    slice assignment instead of rebuilding strings.
+    """
+
+    # bytes used per cell: characters, blank template, and three byte planes
+    BYTES_PER_CELL = array(CHAR_TYPECODE).itemsize * 2 + 3
+
+    def __init__(self, width: int, height: int):
+        self._allocate(width, height)
+
+    def resize(self, width: int, height: int) -> bool:
+        """Reallocate the planes if the size changed. Returns True if it did."""
+        if width == self.width and height == self.height:
+            return False
+        self._allocate(width, height)
+        return True
+
+    def _allocate(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.chars = array(CHAR_TYPECODE, " " * size)
+        self.backgrounds = bytearray(size)
+        self.foregrounds = bytearray(size)
+        self.styles = bytearray(size)
+        self._blank = array(CHAR_TYPECODE, " " * size)
+
+    def clear(self, background: int, foreground: int):
+        """Reset every cell in place to a blank, unstyled cell."""
+        size = self.width * self.height
+        self.chars[:] = self._blank
+        self.backgrounds[:] = bytes((background,)) * size
+        self.foregrounds[:] = bytes((foreground,)) * size
+        self.styles[:] = bytes(size)
+
+    def copyRows(self, source: "FrameBuffer", top: int):
+        """Copy an equally wide buffer's rows, from row `top` on, into this one."""
+        start = max(top, 0) * self.width
+        end = min(start + self.width * self.height, len(source.chars))
+        if start >= end:
+            return
+        count = end - start
+        self.chars[:count] = source.chars[start:end]
+        self.backgrounds[:count] = source.backgrounds[start:end]
+        self.foregrounds[:count] = source.foregrounds[start:end]
+        self.styles[:count] = source.styles[start:end]
+
+    def write(self, x: int, y: int, text: str, style: int = None):
+        """Write a single line of text at (x, y), clipped to the buffer."""
+        if y < 0 or y >= self.height:
+            return
+        start = max(x, 0)
+        end = min(x + len(text), self.width)
+        if start >= end:
+            return
+        if start != x or end - x != len(text):
+            text = text[start - x : end - x]
+        if "\t" in text:
+            text = text.replace("\t", " ")
+        offset = y * self.width
+        self.chars[offset + start : offset + end] = array(CHAR_TYPECODE, text)
+        if style is not None:
+            self.styles[offset + start : offset + end] = bytes((style,)) * (end - start)
+
+    def writeColumn(self, x: int, y: int, char: str, height: int):
+        """Write a character down `height` rows from (x, y), clipped to the buffer."""
+        if x < 0 or x >= self.width:
+            return
+        start = max(y, 0)
+        end = min(y + height, self.height)
+        if start >= end:
+            return
+        width = self.width
+        # every row of the column in a single strided slice
+        self.chars[start * width + x : end * width + x : width] = array(
+            CHAR_TYPECODE, char * (end - start)
+        )
+
+    def fillBackground(self, x: int, y: int, width: int, height: int, index: int):
+        self._fill(self.backgrounds, x, y, width, height, index)
+
+    def fillForeground(self, x: int, y: int, width: int, height: int, index: int):
+        self._fill(self.foregrounds, x, y, width, height, index)
+
+    def _fill(self, plane: bytearray, x, y, width, height, index):
+        start = max(x, 0)
+        end = min(x + width, self.width)
+        if start >= end:
+            return
+        run = bytes((index,)) * (end - start)
+        for row in range(max(y, 0), min(y + height, self.height)):
+            offset = row * self.width
+            plane[offset + start : offset + end] = run
+
+    def rowText(self, y: int) -> str:
+        offset = y * self.width
+        return self.chars[offset : offset + self.width].tounicode()
+
+    def text(self) -> str:
+        return self.chars.tounicode()
+
+    def rowRuns(self, y: int) -> List[StyleRun]:
+        """Runs of cells on row y with the same style, foreground and background."""
+        width = self.width
+        if width == 0:
+            return []
+        offset = y * width
+        styles = self.styles[offset : offset + width]
+        foregrounds = self.foregrounds[offset : offset + width]
+        backgrounds = self.backgrounds[offset : offset + width]
+
+        # most rows have a single set of attributes, skip them without scanning
+        if (
+            styles.count(styles[0]) == width
+            and foregrounds.count(foregrounds[0]) == width
+            and backgrounds.count(backgrounds[0]) == width
+        ):
+            return [StyleRun(0, width, styles[0], foregrounds[0], backgrounds[0])]
+
+        runs = []
+        start = 0
+        current = (styles[0], foregrounds[0], backgrounds[0])
+        for x, attributes in enumerate(zip(styles, foregrounds, backgrounds)):
+            if attributes != current:
+                runs.append(StyleRun(start, x, *current))
+                start = x
+                current = attributes
+        runs.append(StyleRun(start, width, *current))
+        return runs
@@ -0,0 +1,252 @@
+from bisect import bisect_right
+from typing import List, Optional
+
+from ..adom import Document, Element
+from ..profiler import profiler
+from ..vector import Vec, cloneVec
+from .element_util import (
+    TableLayout,
+    cacheLayout,
+    getAlignOffset,
+    getElementSize,
+    getTableLayout,
+)
+from .palette import getColorIndex
+from .style_constants import STYLE_CODES, TextStyles
+from .text_util import getLinkText, getRenderedFont, getWrapAndSize
+from .util import getDirection, getPadding, parseSize
+
+
+class LayoutBox:
+    """An element positioned by the layout pass.
+
+    Coordinates are absolute document coordinates (row 0 is the top of the
+    document, not of the screen), so a box tree stays valid while scrolling.
+    """
+
+    def __init__(self, element: Optional[Element], x: int, y: int, size: Vec):
+        self.element = element
+        self.x = x
+        self.y = y
+        self.size = size
+        # space that was available to the element, inputs are drawn from it
+        self.parentSize = size
+        self.children: List[LayoutBox] = []
+        # bottom edge of each child, only kept for column layouts
+        self.childBottoms: Optional[List[int]] = None
+        self.background: Optional[int] = None
+        self.foreground: Optional[int] = None
+        self.border: Optional[str] = None
+        # wrapped text, one line per row starting at (lineX, lineY)
+        self.lines: List[str] = []
+        self.lineX = x
+        self.lineY = y
+        self.style: Optional[int] = None
+        # table grid, its cells are only laid out for the rows being painted
+        self.table: Optional[TableLayout] = None
+
+    def addChild(self, child: "LayoutBox"):
+        self.children.append(child)
+        if self.childBottoms is not None:
+            self.childBottoms.append(child.y + child.size.y)
+
+    def visibleChildren(self, top: int, bottom: int) -> List["LayoutBox"]:
+        """Children that may intersect the rows [top, bottom)."""
+        if self.table is not None:
+            return layoutTableCells(self, top, bottom)
+        if self.childBottoms is None:
+            return self.children
+        # column children are stacked, so their bottoms are sorted
+        start = bisect_right(self.childBottoms, top)
+        end = start
+        while end < len(self.children) and self.children[end].y < bottom:
+            end += 1
+        return self.children[start:end]
+
+
+def layoutDocument(document: Document, width: int, height: int) -> LayoutBox:
+    """Lay out the top level elements of a document as a single column."""
+    root = LayoutBox(None, 0, 0, Vec(width, 0))
+    root.childBottoms = []
+
+    viewport = Vec(width, height)
+    for element in document.elements:
+        with profiler.trace_element("layout", element, root.size.y):
+            box = layoutElement(element, 0, root.size.y, viewport)
+        root.addChild(box)
+        root.size.y += box.size.y
+
+    return root
+
+
+def layoutElement(element: Element, x: int, y: int, parentSize: Vec) -> LayoutBox:
+    """Position an element and its subtree, cached until the element changes."""
+    return cacheLayout(
+        element,
+        ("box", x, y, parentSize.x, parentSize.y),
+        lambda: _layoutElement(element, x, y, parentSize),
+    )
+
+
+def _layoutElement(element: Element, x: int, y: int, parentSize: Vec) -> LayoutBox:
+    box = LayoutBox(element, x, y, Vec(0, 0))
+    box.parentSize = cloneVec(parentSize)
+
+    box.background = getColorIndex(element.getAttribute("background"))
+    box.foreground = getColorIndex(element.getAttribute("foreground"))
+
+    if element.type == "cont":
+        padding = getPadding(element, parentSize.x, parentSize.y)
+        direction = getDirection(element)
+        box.border = element.getAttribute("border")
+
+        box.size = getElementSize(element, parentSize)
+
+        paddingSize = Vec(
+            padding["left"] + padding["right"], padding["top"] + padding["bottom"]
+        )
+        innerSize = box.size - paddingSize
+
+        offset = Vec(padding["left"], padding["top"])
+        if box.border is not None:
+            offset.x += 1
+            offset.y += 1
+            innerSize.x -= 2
+            innerSize.y -= 2
+
+        if direction == "column":
+            box.childBottoms = []
+
+        for child in element.children:
+            childBox = layoutElement(child, x + offset.x, y + offset.y, innerSize)
+            box.addChild(childBox)
+
+            if direction == "row":
+                offset.x += childBox.size.x
+            elif direction == "column":
+                offset.y += childBox.size.y
+
+    elif element.type == "text":
+        if element.value:
+            preserve_whitespace = element.getAttribute("preserve") == "true"
+            font = element.getAttribute("font")
+
+            padding = getPadding(element, parentSize.x, parentSize.y)
+            paddingSize = Vec(
+                padding["left"] + padding["right"], padding["top"] + padding["bottom"]
+            )
+            innerSize = parentSize - paddingSize
+
+            maxWidth = innerSize.x
+            widthAttr = element.getAttribute("width")
+            renderWidth = (
+                parseSize(widthAttr, maxWidth) if widthAttr is not None else maxWidth
+            )
+
+            toRender = getRenderedFont(element.value, preserve_whitespace, font)
+            alignOffset = getAlignOffset(element, toRender, innerSize)
+
+            # We need to preserve whitespace when using a custom font to maintain the font's layout
+            wrapped = getWrapAndSize(
+                toRender,
+                renderWidth,
+                True if font is not None else preserve_whitespace,
+            )
+
+            box.size = wrapped["size"] + paddingSize
+            box.x = x + alignOffset
+            box.lines = wrapped["text"].splitlines()
+            box.lineX = box.x + paddingSize.x
+            box.lineY = y + padding["top"]
+            box.style = _getStyleCode(element.getAttribute("style"))
+        else:
+            box.size = Vec(0, 1)
+
+    elif element.type == "link":
+        toRender = getLinkText(element)
+
+        alignOffset = getAlignOffset(element, toRender, parentSize)
+        maxWidth = parentSize.x
+        widthAttr = element.getAttribute("width")
+        renderWidth = (
+            parseSize(widthAttr, maxWidth) if widthAttr is not None else maxWidth
+        )
+
+        wrapped = getWrapAndSize(toRender, renderWidth)
+
+        box.size = wrapped["size"]
+        box.lines = wrapped["text"].splitlines()
+        box.lineX = x + alignOffset
+        box.style = _getStyleCode(element.getAttribute("style"))
+
+    elif element.type == "input":
+        # the contents depend on focus and cursor, they are drawn when painting
+        box.size = getElementSize(element, parentSize)
+
+    elif element.type == "br":
+        box.size = Vec(1, 1)
+
+    elif element.type == "table":
+        # tables are just like containers, but they manage the rows and cells
+        # notes:
+        # - tables dont have padding
+        # - tables have a default border type of "dotted thick"
+
+        borderType = element.getAttribute("border")
+        box.border = "dotted thick" if borderType is None else borderType
+
+        box.size = getElementSize(element, parentSize)
+
+        # cells are laid out by visibleChildren, only for the rows that are painted
+        box.table = getTableLayout(element, parentSize)
+
+    elif element.type == "cell":
+        # a cell is just like a container, except the default width is to fit the content
+        # and the default height is to fit the content
+        box.size = getElementSize(element, parentSize)
+
+        padding = getPadding(element, parentSize.x, parentSize.y)
+        paddingSize = Vec(
+            padding["left"] + padding["right"], padding["top"] + padding["bottom"]
+        )
+        innerSize = parentSize - paddingSize
+
+        direction = getDirection(element)
+        if direction == "column":
+            box.childBottoms = []
+
+        offset = Vec(padding["left"], padding["top"])
+        for child in element.children:
+            childBox = layoutElement(child, x + offset.x, y + offset.y, innerSize)
+            box.addChild(childBox)
+            if direction == "row":
+                offset.x += childBox.size.x
+            elif direction == "column":
+                offset.y += childBox.size.y
+
+    return box
+
+
+def layoutTableCells(box: LayoutBox, top: int, bottom: int) -> List[LayoutBox]:
+    """Lay out the cells of the table rows that intersect the rows [top, bottom)."""
+    table = box.table
+    cells = []
+    # row offsets are sorted, so the first visible row can be found directly
+    first = max(bisect_right(table.rowOffsets, top - box.y) - 1, 0)
+    for i in range(first, len(table.rows)):
+        rowY = box.y + table.rowOffsets[i]
+        if rowY >= bottom:
+            break
+        offsetX = 1
+        for j, cell in enumerate(table.cells[i]):
+            slot = Vec(table.columnWidths[j], table.rowHeights[i])
+            cells.append(layoutElement(cell, box.x + offsetX, rowY, slot))
+            # step over the cell and its column separator
+            offsetX += table.columnWidths[j] + 1
+    return cells
+
+
+def _getStyleCode(textStyle: Optional[str]) -> Optional[int]:
+    if textStyle is not None and textStyle.startswith(TextStyles):
+        return STYLE_CODES.get(textStyle, STYLE_CODES["normal"])
+    return None
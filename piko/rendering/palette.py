@@ -0,0 +1,145 @@
+"""Colors of the frame buffer.
+
+Cells keep one byte per color. Indices 1-8 are the named colors of
+COLORS_PAIRS, the following ones are handed out on first use to xterm
+256-color values (`"208"`) and 24-bit values (`"#ff8800"`).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from ..adom.constants import COLORS_PAIRS, COLORS_PAIRS_REVERSE
+from ..config import COLORMAP
+
+# a color index has to fit in a cell's byte
+MAX_COLORS = 256
+
+# what the named colors look like, to find the closest one to any other color
+NAMED_RGB = {
+    "white": (229, 229, 229),
+    "black": (0, 0, 0),
+    "blue": (0, 0, 238),
+    "red": (205, 0, 0),
+    "green": (0, 205, 0),
+    "yellow": (205, 205, 0),
+    "magenta": (205, 0, 205),
+    "cyan": (0, 205, 205),
+}
+
+# channel levels of the xterm 6x6x6 color cube
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+
+class PaletteColor:
+    """A color that cells refer to by index.
+
+    `ansi` is the xterm palette number, `rgb` is only set for 24-bit colors
+    and `fallback` is the closest named color, for terminals with 8 colors.
+    """
+
+    def __init__(self, ansi: int, rgb: Optional[Tuple[int, int, int]], fallback: int):
+        self.ansi = ansi
+        self.rgb = rgb
+        self.fallback = fallback
+
+
+# index 0 is never stored in a frame, frames are cleared to the document colors
+_colors: List[Optional[PaletteColor]] = [None]
+_indices: Dict[str, int] = {}
+
+for _index in sorted(COLORS_PAIRS):
+    _colors.append(PaletteColor(COLORMAP[_index], None, _index))
+
+
+def getColorIndex(value: Optional[str]) -> Optional[int]:
+    """Index of a color attribute value, None if it is not a color."""
+    if value is None:
+        return None
+    index = COLORS_PAIRS_REVERSE.get(value)
+    if index is not None:
+        return index
+    index = _indices.get(value)
+    if index is not None:
+        return index
+
+    color = _parseColor(value.strip().lower())
+    if color is None:
+        return None
+    if len(_colors) >= MAX_COLORS:
+        # out of indices, show the closest named color instead
+        return color.fallback
+
+    index = len(_colors)
+    _colors.append(color)
+    _indices[value] = index
+    return index
+
+
+def getPaletteColor(index: int) -> PaletteColor:
+    return _colors[index]
+
+
+def _parseColor(value: str) -> Optional[PaletteColor]:
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) == 3:
+            digits = "".join(digit * 2 for digit in digits)
+        if len(digits) != 6:
+            return None
+        try:
+            rgb = tuple(int(digits[i : i + 2], 16) for i in (0, 2, 4))
+        except ValueError:
+            return None
+        return PaletteColor(_nearestXterm(rgb), rgb, _nearestNamed(rgb))
+
+    if value.isdigit() and int(value) < 256:
+        code = int(value)
+        return PaletteColor(code, None, _nearestNamed(_xtermRgb(code)))
+
+    return None
+
+
+def _distance(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> int:
+    return sum((x - y) * (x - y) for x, y in zip(a, b))
+
+
+def _nearestNamed(rgb: Tuple[int, int, int]) -> int:
+    if max(rgb) - min(rgb) < 32:
+        # by distance a gray can end up as a color, use black or white instead
+        name = "white" if sum(rgb) >= 3 * 128 else "black"
+        return COLORS_PAIRS_REVERSE[name]
+    name = min(NAMED_RGB, key=lambda name: _distance(NAMED_RGB[name], rgb))
+    return COLORS_PAIRS_REVERSE[name]
+
+
+def _xtermRgb(code: int) -> Tuple[int, int, int]:
+    if code < 16:
+        # the 16 system colors, bright ones are the named colors lightened
+        name = COLORS_PAIRS[
+            next(index for index, ansi in COLORMAP.items() if ansi == code % 8)
+        ]
+        rgb = NAMED_RGB[name]
+        if code >= 8:
+            rgb = tuple(min(channel + 50, 255) for channel in rgb)
+        return rgb
+    if code < 232:
+        code -= 16
+        return (
+            CUBE_LEVELS[code // 36],
+            CUBE_LEVELS[code // 6 % 6],
+            CUBE_LEVELS[code % 6],
+        )
+    gray = 8 + (code - 232) * 10
+    return gray, gray, gray
+
+
+def _nearestXterm(rgb: Tuple[int, int, int]) -> int:
+    levels = [
+        min(range(6), key=lambda level: abs(CUBE_LEVELS[level] - channel))
+        for channel in rgb
+    ]
+    cube = 16 + levels[0] * 36 + levels[1] * 6 + levels[2]
+    average = sum(rgb) // 3
+    gray = 232 + min(max((average - 8 + 5) // 10, 0), 23)
+    if _distance(_xtermRgb(gray), rgb) < _distance(_xtermRgb(cube), rgb):
+        return gray
+    return cube
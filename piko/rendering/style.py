@@ -1,7 +1,11 @@
-from ..vector import Vec
+class StyleRun:
+    """Cells [start, end) of a row that share a style, foreground and background."""
 
-
-class OutputStyle:
-    def __init__(self, start: Vec, style: str):
+    def __init__(
+        self, start: int, end: int, style: int, foreground: int, background: int
+    ):
         self.start = start
+        self.end = end
         self.style = style
+        self.foreground = foreground
+        self.background = background
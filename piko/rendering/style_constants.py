@@ -1,6 +1,10 @@
 # Text styling options
 TextStyles = ("bold", "underline")
 
+# Style indices stored in the frame buffer's style plane
+STYLE_NAMES = ("normal", "bold", "underline")
+STYLE_CODES = {name: index for index, name in enumerate(STYLE_NAMES)}
+
 # Color mapping for terminal colors
 COLORS_PAIRS = {
     1: "white",
@@ -1,29 +1,32 @@
+from functools import lru_cache
 from textwrap import TextWrapper
-from typing import Union
-
-from art import text2art
+from typing import List, Tuple, Union
 
+from ..adom import Element, get_all_elements
 from ..vector import Vec
+from .font_cache import renderFont
 
-# Text wrapper that preserves whitespace more strictly
-text_wrapper_preserve = TextWrapper(
-    replace_whitespace=False,
-    break_long_words=True,
-    expand_tabs=True,
-    tabsize=4,
-    drop_whitespace=False,
-)
-
-# Text wrapper for normal text
-text_wrapper = TextWrapper(
-    replace_whitespace=False,
-    break_long_words=True,
-    expand_tabs=True,
-    tabsize=4,
-)
+# number of distinct (text, width, preserve_whitespace) wraps kept in memory
+WRAP_CACHE_SIZE = 16384
 
 
 def getWrapAndSize(text: str, maxWidth: int, preserve_whitespace: bool = False):
+    wrappedText, width, height = _wrap(text, maxWidth, preserve_whitespace)
+    return {"text": wrappedText, "size": Vec(width, height)}
+
+
+def getWrapCacheInfo():
+    """Hit/miss counters of the text wrapping cache."""
+    return _wrap.cache_info()
+
+
+def clearWrapCache():
+    """Forget the wrapped texts, so they are wrapped again."""
+    _wrap.cache_clear()
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def _wrap(text: str, maxWidth: int, preserve_whitespace: bool) -> Tuple[str, int, int]:
     if preserve_whitespace:
         # When preserving whitespace, don't do any automatic wrapping
         # Just split by existing line breaks and truncate lines that are too long
@@ -40,19 +43,23 @@ def getWrapAndSize(text: str, maxWidth: int, preserve_whitespace: bool = False):
                 truncated_lines.append(line)
                 actual_width = max(actual_width, len(line))
 
-        result_text = "\n".join(truncated_lines)
-        return {"text": result_text, "size": Vec(actual_width, len(truncated_lines))}
+        return "\n".join(truncated_lines), actual_width, len(truncated_lines)
     else:
-        # Use normal text wrapping
-
-        wrapper = text_wrapper
-        wrapper.width = maxWidth
+        # Use normal text wrapping. Every call gets its own wrapper so nothing
+        # is shared between the input thread and the render path.
+        wrapper = TextWrapper(
+            width=maxWidth,
+            replace_whitespace=False,
+            break_long_words=True,
+            expand_tabs=True,
+            tabsize=4,
+        )
         wrappedText = wrapper.fill(text)
 
         lines = wrappedText.splitlines()
         longest_line = max(len(line) for line in lines) if len(lines) > 0 else 0
 
-        return {"text": wrappedText, "size": Vec(longest_line, len(lines))}
+        return wrappedText, longest_line, len(lines)
 
 
 def getRenderedFont(value: Union[str, None], preserve_whitespace: bool, font: str) -> str:
@@ -61,9 +68,22 @@ def getRenderedFont(value: Union[str, None], preserve_whitespace: bool, font: st
     if not preserve_whitespace:
         value = value.strip()
     if font:
-        return text2art(value, font=font).rstrip()
+        return renderFont(value, font)
     return value
 
 
+def prerenderFonts(elements: List[Element]):
+    """Render the ASCII-art fonts of text elements ahead of layout.
+
+    Fonts are slow to render and the results are cached, so this can run
+    off the main thread while a page loads.
+    """
+    for element in get_all_elements(elements):
+        font = element.getAttribute("font")
+        if element.type == "text" and element.value and font is not None:
+            preserve_whitespace = element.getAttribute("preserve") == "true"
+            getRenderedFont(element.value, preserve_whitespace, font)
+
+
 def getLinkText(element):
     return "[" + element.getAttribute("key") + "] " + element.value
@@ -0,0 +1,55 @@
+"""
+Traces of a session in the Chrome trace event format.
+
+The written file opens in chrome://tracing and https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+
+class Tracer:
+    """Collects spans in memory and writes them to a file when asked.
+
+    Spans are complete ("X") events in microseconds of time.perf_counter,
+    recorded on the thread they ran on. Any thread may add spans.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Set[int] = set()
+
+    def add(
+        self, name: str, start: float, duration: float, args: Optional[dict] = None
+    ) -> None:
+        tid = threading.get_ident()
+        if tid not in self.threads:
+            self.threads.add(tid)
+            # names the thread's row in the viewer
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, stream)
@@ -1,122 +1,226 @@
-import curses
+import time
+from array import array
+from itertools import groupby
+from operator import eq
+from typing import List
 
+from .adom.constants import COLORS_PAIRS_REVERSE
+from .backends import Backend
+from .pacing import FramePacer
+from .profiler import profiler
+from .rendering.framebuffer import CHAR_TYPECODE
 
-class Window:
-    def __init__(self, screen):
-        y, x = screen.getmaxyx()
-        self.WIDTH = x
-        self.HEIGHT = y
-        curses.noecho()
-        screen.keypad(True)
-        screen.clear()
-        self.screen = screen
-        self.exiting = False
+# unchanged cells between two changed spans of a row are drawn again when
+# there are fewer of them than the bytes it takes to move the cursor past them
+MIN_SKIPPED_CELLS = 4
 
-        # Create a buffer window for double buffering
-        self.buffer = curses.newwin(y, x)
-        self.buffer.keypad(True)
 
-        # Track dirty regions
-        self.dirty_regions = []
-        self.last_frame = None
+class Window:
+    def __init__(self, backend: Backend):
+        self.backend = backend
+        backend.start()
+        self.HEIGHT, self.WIDTH = backend.get_size()
+        self.exiting = False
+        self.pacer = FramePacer()
+        self._allocate_frames()
 
     def resize(self):
         """Handle terminal resize events."""
-        # Get new dimensions
-        y, x = self.screen.getmaxyx()
-
-        # Clear both screens
-        self.screen.clear()
-        if self.buffer:
-            self.buffer.clear()
-
-        # Resize terminal
-        curses.resizeterm(y, x)
-        self.WIDTH = x
-        self.HEIGHT = y
-
-        # Recreate buffer with new dimensions
-        self.buffer = curses.newwin(y, x)
-        self.buffer.keypad(True)
-
-        # Reset state
-        self.dirty_regions = []
-        self.last_frame = None
-
-        # Mark entire screen as dirty
-        self.mark_dirty_region(0, 0, y, x)
+        self.HEIGHT, self.WIDTH = self.backend.resize()
+
+        # Reset state, the next frame is drawn in full
+        self._allocate_frames()
+
+    def _allocate_frames(self):
+        """Cells of the frame being rendered and of the last frame drawn.
+
+        Each cell is a character and its attributes, packed by
+        `_pack_attributes`, indexed by `y * WIDTH + x`.
+        """
+        size = self.WIDTH * self.HEIGHT
+        self.cursor = 0
+        self.frame_chars = array(CHAR_TYPECODE, " " * size)
+        # cells nothing is rendered to stay white on black
+        blank = _pack_attributes(
+            0, COLORS_PAIRS_REVERSE["black"], COLORS_PAIRS_REVERSE["white"]
+        )
+        self.frame_attributes = array("q", [blank]) * size
+        self.last_chars = array(CHAR_TYPECODE, " " * size)
+        # no cell matches until the first frame has been drawn
+        self.last_attributes = array("q", [-1]) * size
+        self.cleared = True
+
+    def draw_changes(self) -> int:
+        """Draw the spans of each row that differ from the last frame.
+
+        Cells that didn't change are skipped, unless there are fewer than
+        MIN_SKIPPED_CELLS of them between two spans. Returns the number of
+        cells drawn.
+        """
+        drawn = 0
+        width = self.WIDTH
+        for y in range(self.HEIGHT):
+            start = y * width
+            end = start + width
+            chars = self.frame_chars[start:end]
+            attributes = self.frame_attributes[start:end]
+            last_chars = self.last_chars[start:end]
+            last_attributes = self.last_attributes[start:end]
+            if chars == last_chars and attributes == last_attributes:
+                continue
+
+            first = _common_prefix(chars, last_chars, attributes, last_attributes)
+            stop = width - _common_suffix(
+                chars[first:],
+                last_chars[first:],
+                attributes[first:],
+                last_attributes[first:],
+            )
+
+            if self.cleared:
+                spans = [(first, stop)]
+            else:
+                spans = _changed_spans(
+                    chars, last_chars, attributes, last_attributes, first, stop
+                )
+            for span_start, span_end in spans:
+                x = span_start
+                for run_attributes, run in groupby(attributes[span_start:span_end]):
+                    length = len(list(run))
+                    self.backend.draw(
+                        y,
+                        x,
+                        chars[x : x + length].tounicode(),
+                        *_unpack_attributes(run_attributes),
+                    )
+                    x += length
+                drawn += span_end - span_start
 
-        # Immediate refresh to prevent flickering
-        self.screen.refresh()
-        self.buffer.refresh()
+        self.last_chars[:] = self.frame_chars
+        self.last_attributes[:] = self.frame_attributes
+        self.cleared = False
+        return drawn
 
     def refresh(self):
-        """Refresh the screen with dirty regions."""
-        # Only copy dirty regions from buffer to screen
-        if self.dirty_regions:
-            for region in self.dirty_regions:
-                y, x, h, w = region
-                try:
-                    self.buffer.copywin(
-                        self.screen, y, x, y, x, y + h - 1, x + w - 1, False
-                    )
-                except Exception:
-                    pass  # Skip if region is invalid
-            self.dirty_regions = []
-        self.screen.refresh()
-        self.buffer.refresh()
-
-    def mark_dirty_region(self, y: int, x: int, height: int, width: int):
-        """Mark a region as needing refresh."""
-        self.dirty_regions.append(
-            (max(0, y), max(0, x), min(height, self.HEIGHT), min(width, self.WIDTH))
-        )
+        """Send the changes of the rendered frame to the terminal.
+
+        Nothing is sent if the frame did not change. The time the flush
+        takes paces the following frames.
+        """
+        with profiler.measure("flush"):
+            drawn = self.draw_changes()
+            if drawn:
+                start = time.perf_counter()
+                written = self.backend.flush()
+                self.pacer.record(time.perf_counter() - start, drawn, written)
 
     def get_resized(self) -> bool:
-        return curses.is_term_resized(self.HEIGHT, self.WIDTH)
+        return self.backend.resized(self.HEIGHT, self.WIDTH)
 
-    def get_input(self) -> chr:
-        res = self.screen.getch()
-        return res
+    def get_input(self) -> int:
+        return self.backend.get_input()
 
-    def get_input_text(self) -> str:
-        res = self.screen.getstr()
-        return res
+    def get_keys(self) -> List[int]:
+        return self.backend.get_keys()
 
-    def get_wide_char(self) -> str:
-        res = self.screen.get_wch()
-        return res
+    def close(self):
+        """Restore the terminal before exiting."""
+        self.backend.close()
 
     def start_render(self, y: int, x: int):
         """Start rendering at the specified position."""
-        try:
-            self.buffer.move(y, x)
-            self.mark_dirty_region(y, x, 1, self.WIDTH - x)
-        except Exception:
-            pass  # Skip if position is invalid
-
-    def render(
-        self, string: str, option, partial_backgrounds: list, partial_foregrounds: list
-    ):
-        """Render a string with attributes."""
-        try:
-            y, x = self.buffer.getyx()
-            for i in range(len(string)):
-                pair = self.get_color_combination(
-                    partial_backgrounds[i], partial_foregrounds[i]
-                )
-                try:
-                    self.buffer.addstr(string[i], curses.color_pair(pair) | option)
-                except curses.error:
-                    pass  # Skip if we're at the screen edge
-            self.mark_dirty_region(y, x, 1, len(string))
-        except Exception as e:
-            print("Error rendering string:")
-            print(e)
-            print(f"String: {string}")
+        if 0 <= y < self.HEIGHT and 0 <= x < self.WIDTH:
+            self.cursor = y * self.WIDTH + x
+
+    def render(self, string: str, style: int, background: int, foreground: int):
+        """Render a run of text that has the same style and colors.
+
+        The run wraps onto the next rows. It is only drawn on refresh, and
+        only where it differs from what is already on the screen.
+        """
+        start = self.cursor
+        length = min(len(string), len(self.frame_chars) - start)
+        if length <= 0:
+            return
+
+        attributes = _pack_attributes(style, background, foreground)
+        end = start + length
+        self.frame_chars[start:end] = array(CHAR_TYPECODE, string[:length])
+        self.frame_attributes[start:end] = array("q", [attributes]) * length
+        self.cursor = end
 
     def disable_cursor(self):
-        curses.curs_set(False)
-
-    def get_color_combination(self, background: int, foreground: int) -> int:
-        return background * 10 + foreground
+        self.backend.hide_cursor()
+
+
+def _pack_attributes(style: int, background: int, foreground: int) -> int:
+    return style << 16 | background << 8 | foreground
+
+
+def _unpack_attributes(attributes: int):
+    return attributes >> 16, attributes >> 8 & 0xFF, attributes & 0xFF
+
+
+def _common_prefix(chars, last_chars, attributes, last_attributes) -> int:
+    """Number of leading cells that are the same in both frames."""
+    low, high = 0, len(chars)
+    # slice comparisons run in C, so bisecting beats a loop over the cells
+    while low < high:
+        mid = (low + high + 1) // 2
+        if (
+            chars[:mid] == last_chars[:mid]
+            and attributes[:mid] == last_attributes[:mid]
+        ):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(chars, last_chars, attributes, last_attributes) -> int:
+    """Number of trailing cells that are the same in both frames."""
+    size = len(chars)
+    low, high = 0, size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if (
+            chars[size - mid :] == last_chars[size - mid :]
+            and attributes[size - mid :] == last_attributes[size - mid :]
+        ):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _changed_spans(chars, last_chars, attributes, last_attributes, start, stop):
+    """Spans of the cells between start and stop that differ in both frames.
+
+    The cells at start and stop - 1 differ. Gaps of unchanged cells shorter
+    than MIN_SKIPPED_CELLS are part of the spans around them.
+    """
+    # compared by map and searched by index, so the cells are looped over in C
+    same = list(
+        map(
+            eq,
+            zip(chars[start:stop], attributes[start:stop]),
+            zip(last_chars[start:stop], last_attributes[start:stop]),
+        )
+    )
+    size = len(same)
+    # ends the last span, the cell before it differs
+    same.append(True)
+    spans = []
+    x = 0
+    while x < size:
+        end = same.index(True, x)
+        while end < size:
+            changed = same.index(False, end)
+            if changed - end >= MIN_SKIPPED_CELLS:
+                break
+            end = same.index(True, changed)
+        else:
+            changed = size
+        spans.append((start + x, start + end))
+        x = changed
+    return spans
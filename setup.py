@@ -37,7 +37,16 @@ setup(
     author_email=EMAIL,
     python_requires=REQUIRES_PYTHON,
     url=URL,
-    packages=find_packages(exclude=["tests", "*.tests", "*.tests.*", "tests.*"]),
+    packages=find_packages(
+        exclude=[
+            "tests",
+            "*.tests",
+            "*.tests.*",
+            "tests.*",
+            "benchmarks",
+            "benchmarks.*",
+        ]
+    ),
     scripts=["bin/piko"],
     install_requires=REQUIRED,
     extras_require=EXTRAS,
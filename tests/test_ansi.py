@@ -0,0 +1,163 @@
+"""
+The escape sequences the ANSI backend writes for what is drawn.
+"""
+
+import os
+
+import pytest
+
+from piko.adom.constants import COLORS_PAIRS_REVERSE
+from piko.backends import AnsiBackend
+from piko.backends.capabilities import Capabilities
+from piko.rendering.palette import getColorIndex
+from piko.rendering.style_constants import STYLE_CODES
+
+WIDTH = 20
+HEIGHT = 5
+
+BOLD = STYLE_CODES["bold"]
+UNDERLINE = STYLE_CODES["underline"]
+WHITE = COLORS_PAIRS_REVERSE["white"]
+BLACK = COLORS_PAIRS_REVERSE["black"]
+RED = COLORS_PAIRS_REVERSE["red"]
+
+
+@pytest.fixture
+def make_backend(monkeypatch):
+    """Make a backend that writes to a pipe, with the given capabilities."""
+    monkeypatch.setattr(AnsiBackend, "_query_size", lambda self: (HEIGHT, WIDTH))
+    pipes = []
+
+    def make(**capabilities) -> AnsiBackend:
+        read_fd, write_fd = os.pipe()
+        pipes.append((read_fd, write_fd))
+        output = os.fdopen(write_fd, "wb", closefd=False)
+        backend = AnsiBackend(output, output, Capabilities(**capabilities))
+        backend.read_fd = read_fd
+        return backend
+
+    yield make
+    for fds in pipes:
+        for fd in fds:
+            os.close(fd)
+
+
+def flushed(backend: AnsiBackend) -> bytes:
+    """Flush the backend and return the bytes it wrote."""
+    written = backend.flush()
+    data = os.read(backend.read_fd, 65536) if written else b""
+    assert written == len(data)
+    return data
+
+
+def test_first_draw_moves_and_resets_attributes(make_backend):
+    backend = make_backend()
+    backend.draw(1, 2, "hi", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[2;3H\x1b[0;37;40mhi"
+
+
+def test_nothing_drawn_writes_nothing(make_backend):
+    backend = make_backend()
+    assert flushed(backend) == b""
+
+
+def test_moves_forward_on_the_same_row(make_backend):
+    backend = make_backend()
+    backend.draw(0, 0, "ab", 0, BLACK, WHITE)
+    # right after the last run, no move
+    backend.draw(0, 2, "cd", 0, BLACK, WHITE)
+    # further along the row, a relative move
+    backend.draw(0, 7, "ef", 0, BLACK, WHITE)
+    # back on the row and on another row, absolute moves
+    backend.draw(0, 1, "g", 0, BLACK, WHITE)
+    backend.draw(3, 4, "h", 0, BLACK, WHITE)
+    assert flushed(backend) == (
+        b"\x1b[1;1H\x1b[0;37;40mabcd\x1b[3Cef\x1b[1;2Hg\x1b[4;5Hh"
+    )
+
+
+def test_sends_only_the_attributes_that_change(make_backend):
+    backend = make_backend()
+    backend.draw(0, 0, "a", 0, BLACK, WHITE)
+    backend.draw(0, 1, "b", BOLD, BLACK, WHITE)
+    backend.draw(0, 2, "c", BOLD, BLACK, RED)
+    backend.draw(0, 3, "d", UNDERLINE, RED, RED)
+    backend.draw(0, 4, "e", 0, RED, RED)
+    assert flushed(backend) == (
+        b"\x1b[1;1H\x1b[0;37;40ma"
+        b"\x1b[1mb"
+        b"\x1b[31mc"
+        b"\x1b[22;4;41md"
+        b"\x1b[24me"
+    )
+
+
+def test_writes_256_and_24_bit_colors(make_backend):
+    orange = getColorIndex("208")
+    teal = getColorIndex("#008080")
+    backend = make_backend()
+    backend.draw(0, 0, "a", 0, orange, teal)
+    assert flushed(backend) == b"\x1b[1;1H\x1b[0;38;5;30;48;5;208ma"
+
+    backend = make_backend(truecolor=True)
+    backend.draw(0, 0, "a", 0, orange, teal)
+    assert flushed(backend) == b"\x1b[1;1H\x1b[0;38;2;0;128;128;48;5;208ma"
+
+
+def test_erases_blanks_at_the_end_of_the_row(make_backend):
+    backend = make_backend()
+    backend.draw(2, 10, "ab" + " " * 8, 0, BLACK, WHITE)
+    # the cursor stays after the text, blanks that are erased aren't written
+    backend.draw(2, 12, "c", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[3;11H\x1b[0;37;40mab\x1b[Kc"
+
+
+def test_writes_underlined_blanks_at_the_end_of_the_row(make_backend):
+    backend = make_backend()
+    backend.draw(2, 10, "ab" + " " * 8, UNDERLINE, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[3;11H\x1b[0;4;37;40mab        "
+
+
+def test_reaching_the_last_column_forgets_the_cursor(make_backend):
+    backend = make_backend()
+    backend.draw(0, WIDTH - 2, "ab", 0, BLACK, WHITE)
+    backend.draw(1, 0, "c", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[1;19H\x1b[0;37;40mab\x1b[2;1Hc"
+
+
+def test_wraps_frames_in_synchronized_output(make_backend):
+    backend = make_backend(synchronized_output=True)
+    backend.draw(0, 0, "a", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[?2026h\x1b[1;1H\x1b[0;37;40ma\x1b[?2026l"
+
+
+def test_repeats_runs_of_a_character(make_backend):
+    backend = make_backend(repeat=True)
+    backend.draw(0, 0, "a" + "─" * 10 + "b", 0, BLACK, WHITE)
+    assert flushed(backend) == "\x1b[1;1H\x1b[0;37;40ma─\x1b[9bb".encode()
+
+
+def test_writes_runs_out_when_repeating_is_longer(make_backend):
+    backend = make_backend(repeat=True)
+    backend.draw(0, 0, "aaaab", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[1;1H\x1b[0;37;40maaaab"
+
+
+def test_erases_blank_runs_inside_a_row(make_backend):
+    backend = make_backend(repeat=True, erase_characters=True)
+    backend.draw(0, 0, "a" + " " * 12 + "b", 0, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[1;1H\x1b[0;37;40ma\x1b[12X\x1b[12Cb"
+
+
+def test_repeats_underlined_blanks_instead_of_erasing_them(make_backend):
+    backend = make_backend(repeat=True, erase_characters=True)
+    backend.draw(0, 0, "a" + " " * 12 + "b", UNDERLINE, BLACK, WHITE)
+    assert flushed(backend) == b"\x1b[1;1H\x1b[0;4;37;40ma \x1b[11bb"
+
+
+def test_writes_runs_out_without_the_capabilities(make_backend):
+    backend = make_backend()
+    backend.draw(0, 0, "a" + " " * 12 + "─" * 5, 0, BLACK, WHITE)
+    assert flushed(backend) == ("\x1b[1;1H\x1b[0;37;40ma" + " " * 12 + "─" * 5).encode(
+        "utf-8"
+    )
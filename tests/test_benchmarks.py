@@ -0,0 +1,43 @@
+"""
+The synthetic documents of the benchmarks, rendered on the headless backend.
+"""
+
+import pytest
+
+import piko.adom
+from benchmarks.documents import DOCUMENTS, table
+from benchmarks.run import URL, benchmark
+from piko.backends import HeadlessBackend
+from piko.browser import Browser
+from piko.renderer import Renderer
+from piko.rendering import font_cache
+from piko.window import Window
+
+
+def render(xml: str, width: int, height: int) -> HeadlessBackend:
+    backend = HeadlessBackend(width, height)
+    window = Window(backend)
+    browser = Browser(URL)
+    renderer = Renderer(window, browser)
+    browser.finish_load(URL, piko.adom.xml2doc(xml, browser))
+    renderer.render(force=True)
+    window.refresh()
+    return backend
+
+
+def test_table_cells_show_their_words():
+    backend = render(table(rows=2, columns=3), 80, 10)
+    assert backend.row_text(2).startswith(
+        "│lorem   │ipsum dolor                │dolor sit amet│"
+    )
+    assert backend.row_text(4).startswith(
+        "│sit amet│amet consectetur adipiscing│consectetur   │"
+    )
+
+
+@pytest.mark.parametrize("name", DOCUMENTS)
+def test_benchmark_times_every_stage(name, monkeypatch):
+    monkeypatch.setattr(font_cache, "FONT_DISK_CACHE", False)
+    result = benchmark(DOCUMENTS[name](), 120, 40, 1)
+    assert result["elements"] > 0
+    assert all(result["stages"][stage] for stage in ("parse", "layout", "frame"))
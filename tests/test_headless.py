@@ -0,0 +1,148 @@
+"""
+The terminal browser driven end to end on the headless backend, on both
+runtimes.
+"""
+
+import threading
+import time
+
+import pytest
+
+import piko.browser
+from piko.app import TerminalBrowser
+from piko.async_app import AsyncTerminalBrowser
+from piko.backends import HeadlessBackend
+from piko.config import (
+    DEBUG_WINDOW_HEIGHT,
+    KEY_BACKSPACE,
+    KEY_DEBUG,
+    KEY_ENTER,
+    KEY_ESC,
+    KEY_RESIZE,
+    KEY_UNFOCUS,
+)
+from piko.profiler import profiler
+from piko.rendering import font_cache
+
+WIDTH = 100
+HEIGHT = 30
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll condition until it is true or timeout seconds passed."""
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def run(terminal_browser: TerminalBrowser, backend: HeadlessBackend):
+    """Run the browser until the test is done, with the first page loaded."""
+    threads = set(threading.enumerate())
+
+    def setup():
+        try:
+            terminal_browser.setup(backend)
+        except SystemExit:
+            pass  # the browser only stops by exiting
+
+    main = threading.Thread(target=setup, daemon=True)
+    main.start()
+    try:
+        assert wait_for(
+            lambda: terminal_browser.browser is not None
+            and not terminal_browser.browser.loading
+            and backend.frames
+            and "Exit" in backend.text()
+        )
+        yield terminal_browser, backend
+    finally:
+        # Alt+K turns the profiler on for the whole process
+        profiler.enabled = False
+        profiler.reset()
+        # the key wakes the input thread, which wakes the main loop to exit
+        terminal_browser.window.exiting = True
+        backend.send_keys(KEY_RESIZE)
+        main.join(5)
+        assert not main.is_alive()
+        assert wait_for(lambda: set(threading.enumerate()) <= threads)
+
+
+@pytest.fixture(
+    params=[TerminalBrowser, AsyncTerminalBrowser], ids=["threads", "asyncio"]
+)
+def browser(request, monkeypatch):
+    # fonts are rendered every time instead of being read from the user's cache
+    monkeypatch.setattr(font_cache, "FONT_DISK_CACHE", False)
+    yield from run(request.param("piko://welcome"), HeadlessBackend(WIDTH, HEIGHT))
+
+
+def test_renders_welcome(browser):
+    terminal_browser, backend = browser
+    assert backend.row_text(0).startswith("piko://welcome")
+    assert "[e] Exit" in backend.text()
+
+
+def test_types_into_focused_input(browser):
+    terminal_browser, backend = browser
+    document = terminal_browser.browser.document
+    # the search input has autofocus
+    assert document.get_focused_element() is not None
+
+    backend.send_keys("hello")
+    assert wait_for(lambda: "hello" in backend.text())
+    assert document.get_focused_element().value == "hello"
+    # only the cells that changed are drawn
+    assert 0 < backend.frames[-1].cells < WIDTH * HEIGHT
+
+
+def test_set_size_resizes(browser):
+    terminal_browser, backend = browser
+    backend.set_size(80, 20)
+    assert wait_for(lambda: terminal_browser.window.WIDTH == 80)
+    assert terminal_browser.window.HEIGHT == 20
+    # the frame is drawn again in full at the new size
+    assert wait_for(lambda: backend.row_text(0).startswith("piko://welcome"))
+    assert backend.get_size() == (20, 80)
+
+
+def test_debug_window_toggles(browser):
+    terminal_browser, backend = browser
+    debug_row = HEIGHT - DEBUG_WINDOW_HEIGHT
+    # esc leaves the input, Alt+K then opens the debug window
+    backend.send_keys(27)
+    assert wait_for(lambda: terminal_browser.browser.document.focus == -1)
+    backend.send_keys(KEY_DEBUG)
+    assert wait_for(lambda: "fps" in backend.row_text(debug_row))
+    assert "p50/p95/max ms" in backend.row_text(debug_row + 1)
+
+    backend.send_keys(KEY_DEBUG)
+    assert wait_for(lambda: "fps" not in backend.row_text(debug_row))
+
+
+def test_editing_url_bar_keeps_loading_page(browser, monkeypatch):
+    terminal_browser, backend = browser
+    loads = []
+    loaded = threading.Event()
+
+    def slow_load(URL, browser):
+        loads.append(URL)
+        loaded.wait(5)
+        return loadFromURL(URL, browser)
+
+    loadFromURL = piko.browser.loadFromURL
+    monkeypatch.setattr(piko.browser, "loadFromURL", slow_load)
+
+    # open the page again from the URL bar
+    backend.send_keys(KEY_UNFOCUS, KEY_ESC, KEY_ENTER)
+    assert wait_for(lambda: loads == ["piko://welcome"])
+    # and edit the URL bar while it loads
+    backend.send_keys(KEY_ESC, KEY_BACKSPACE, KEY_BACKSPACE, "x")
+    assert wait_for(lambda: terminal_browser.browser.URL == "piko://welcox")
+
+    loaded.set()
+    assert wait_for(lambda: not terminal_browser.browser.loading)
+    assert loads == ["piko://welcome"]
+    assert wait_for(lambda: "[e] Exit" in backend.text())
@@ -0,0 +1,50 @@
+"""
+Drawing only the cells of a frame that changed.
+"""
+
+from piko.backends import HeadlessBackend
+from piko.window import MIN_SKIPPED_CELLS, Window
+
+WIDTH = 80
+HEIGHT = 3
+
+
+def drawn_frame(row: str) -> Window:
+    """A window that drew `row` on its first row and blanks elsewhere."""
+    window = Window(HeadlessBackend(WIDTH, HEIGHT))
+    window.start_render(0, 0)
+    window.render(row, 0, 2, 1)
+    window.refresh()
+    return window
+
+
+def test_first_frame_is_drawn_whole():
+    window = drawn_frame("a" * WIDTH)
+    assert window.backend.frames[-1].cells == WIDTH * HEIGHT
+
+
+def test_unchanged_cells_between_changes_are_skipped():
+    window = drawn_frame("a" * WIDTH)
+    window.start_render(0, 0)
+    window.render("b" + "a" * (WIDTH - 2) + "b", 0, 2, 1)
+    window.refresh()
+    assert window.backend.frames[-1].cells == 2
+    assert window.backend.row_text(0) == "b" + "a" * (WIDTH - 2) + "b"
+
+
+def test_short_gaps_are_drawn_over():
+    window = drawn_frame("a" * WIDTH)
+    gap = MIN_SKIPPED_CELLS - 1
+    window.start_render(0, 0)
+    window.render("b" + "a" * gap + "b", 0, 2, 1)
+    window.refresh()
+    assert window.backend.frames[-1].cells == gap + 2
+
+
+def test_changed_colors_are_drawn():
+    window = drawn_frame("a" * WIDTH)
+    window.start_render(0, 10)
+    window.render("a" * 5, 0, 3, 1)
+    window.refresh()
+    assert window.backend.frames[-1].cells == 5
+    assert list(window.backend.backgrounds[:16]) == [2] * 10 + [3] * 5 + [2]